@@ -9,16 +9,20 @@ Copyright (c) 2018-2023 Laboratory for Intelligent Integrated Networks of Engine
 import numpy as np
 import geopandas as gpd
 import pandas as pd
+from scipy.spatial import cKDTree
 
-from shapely.geometry import Point
 from shapely.geometry import shape
+import shapely.vectorized
 
 from ElectricGrid.ElectricGrid import ElectricGrid
 from ElectricGrid.ElectricLine import ElectricLine
 from ElectricGrid.Bus import Bus
+from ElectricGrid.StorageC import StorageC
+from ElectricGrid.StorageS import StorageS
 from NGSystem.NGGrid import NGGrid
 from NGSystem.NGPipe import NGPipe
 from NGSystem.NGIndBuffer import NGIndBuffer
+from NGSystem.NGStorage import NGStorage
 from OilSystem.OilGrid import OilGrid
 from OilSystem.OilCrudePipe import OilCrudePipe
 from OilSystem.OilRefPipe import OilRefPipe
@@ -29,10 +33,205 @@ from CoalSystem.CoalRailroad import CoalRailroad
 from SnapEdges2Grid import *
 
 import xml.etree.ElementTree as ET
-from xml.etree.ElementTree import tostring
-from collections import OrderedDict
 import re
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Line added by updateTransporters for each refinement:
+# (line class, line name prefix, line type, AMES subsystem attribute, subsystem line list attribute)
+REF_TO_TRANSPORTER = {
+	'electric power at 132kV': (ElectricLine, 'Transmission Line ', 'ElecLine', 'elecGrid', 'electricLine'),
+	'processed gas': (NGPipe, 'NG Pipeline ', 'NGPipe', 'NGSystem', 'NGPipe'),
+	'syngas': (NGPipe, 'NG Pipeline ', 'NGPipe', 'NGSystem', 'NGPipe'),
+	'raw gas': (NGPipe, 'NG Pipeline ', 'NGPipe', 'NGSystem', 'NGPipe'),
+	'processed oil': (OilRefPipe, 'OilR Pipeline ', 'oilRPipe', 'oilSystem', 'OilRefPipe'),
+	'crude oil': (OilCrudePipe, 'OilC Pipeline ', 'oilCrudePipe', 'oilSystem', 'OilCrudePipe'),
+	'liquid biomass feedstock': (OilCrudePipe, 'OilC Pipeline ', 'oilCrudePipe', 'oilSystem', 'OilCrudePipe'),
+	'water energy': (OilCrudePipe, 'OilC Pipeline ', 'oilCrudePipe', 'oilSystem', 'OilCrudePipe'),
+	'coal': (CoalRailroad, 'coal railroad ', 'railroad', 'coalSystem', 'CoalRailroad'),
+	'other': (OilCrudePipe, 'Other Pipeline ', 'otherPipe', None, None),
+	'solid biomass feedstock': (OilCrudePipe, 'Other Pipeline ', 'otherPipe', None, None),
+	'uranium': (OilCrudePipe, 'Other Pipeline ', 'otherPipe', None, None),
+}
+
+# Independent buffer added by addIndBuffers, the first rule sharing a refinement with the cluster wins
+REF_TO_IND_BUFFER = [
+	(frozenset(['electric power at 132kV']), Bus),
+	(frozenset(['processed gas', 'syngas', 'raw gas']), NGIndBuffer),
+	(frozenset(['processed oil', 'crude oil', 'liquid biomass feedstock', 'water energy']), OilIndBuffer),
+	(frozenset(['solid biomass feedstock']), OilIndBuffer),
+	(frozenset(['coal']), CoalIndBuffer),
+	(frozenset(['other']), Bus),
+]
+
+# Connector added by linkClusterBuffers between a cluster primary and the other nodes of its cluster:
+# (line class, line name prefix, line type, fixed refinement or None to carry the shared refinements)
+LINE_TO_CONNECTOR = {
+	'ElecLine': (ElectricLine, 'Transmission Line Connector ', 'ElecLine', ['electric power at 132kV']),
+	'NGPipe': (NGPipe, 'NG Pipeline Connector ', 'NGPipe', None),
+	'OilRefPipe': (OilRefPipe, 'Refined Oil Pipeline Connector ', 'OilRefPipe', None),
+	'OilCrudePipe': (OilCrudePipe, 'Crude Oil Pipeline Connector ', 'OilCrudePipe', None),
+	'oilCrudePipe': (OilCrudePipe, 'Crude Oil Pipeline Connector ', 'OilCrudePipe', None),
+	'CoalRailroad': (CoalRailroad, 'Coal Railroad Connector ', 'CoalRailroad', None),
+}
+
+# Node types that lines of each type connect to in a cluster, from most to least preferred.
+# The first node of the top type is picked, otherwise the last node of the most preferred type present;
+# None stands for a node of any type
+CLUSTER_PRIMARY_PRIORITY = {
+	'ElecLine': ['LoadC', 'LoadS', 'GenC', 'GenS'],
+	'NGPipe': ['NGReceiptDelivery', None],  # otherwise the last node, whatever its type
+	'OilRefPipe': ['OilPort', 'OilTerminal', 'OilRefinery'],
+	'OilCrudePipe': ['OilPort', 'OilTerminal', 'OilRefinery'],
+	'oilCPipe': ['OilPort', 'OilTerminal', 'OilRefinery'],
+	'oilCrudePipe': ['OilPort', 'OilTerminal', 'OilRefinery'],
+	'CoalRailroad': ['CoalDock', 'CoalSource'],
+}
+
+# Nodes written to the DOFs XML as independent buffers, numbered after all the transformation resources.
+# Every node class that numbers itself from resourceCount[1] must be listed here, and every other node class
+# must take exactly one number from resourceCount[0], or the buffer indices overlap the transformation indices
+IND_BUFFER_CLASSES = (Bus, StorageC, StorageS, NGIndBuffer, NGStorage, OilIndBuffer, CoalIndBuffer)
+
+# Peers that each controller sends to, in the order they are written out
+PEER_RECIPIENTS = {
+	'ISONE': ('ME', 'NH', 'VT', 'MA', 'CT', 'RI', 'NYISO'),
+	'NYISO': ('NY', 'ISONE', 'PJM'),
+	'CAISO': ('CA', 'NWISO', 'SWISO'),
+	'NWISO': ('CA', 'WA', 'OR', 'ID', 'MT', 'WY', 'UT', 'CO', 'CAISO', 'SWISO', 'SPP'),
+	'SWISO': ('NV', 'AZ', 'NM', 'CAISO', 'NWISO', 'SPP', 'ERCOT'),
+	'ERCOT': ('TX', 'SWISO', 'SPP', 'MISO'),
+	'SPP': ('ND', 'SD', 'NE', 'KS', 'OK', 'TX', 'MT', 'MO', 'AR', 'ERCOT', 'SWISO', 'NWISO', 'MISO'),
+	'MISO': ('ND', 'MN', 'IA', 'MO', 'AR', 'LA', 'TX', 'WI', 'IL', 'IN', 'MI', 'KY', 'MS', 'ERCOT', 'SPP', 'PJM', 'TNISO', 'SOCO'),
+	'TNISO': ('KY', 'TN', 'LA', 'MS', 'AL', 'NC', 'VA', 'MISO', 'PJM', 'SOCO', 'CARISO'),
+	'SOCO': ('MS', 'AL', 'GA', 'FL', 'MISO', 'TNISO', 'CARISO', 'FPISO'),
+	'FPISO': ('FL', 'SOCO'),
+	'CARISO': ('SC', 'NC', 'SOCO', 'TNISO', 'PJM'),
+	'PJM': ('NC', 'VA', 'TN', 'KY', 'WV', 'OH', 'IN', 'MI', 'IL', 'MD', 'DE', 'PA', 'NJ', 'CARISO', 'TNISO', 'MISO', 'NYISO'),
+}
+
+# Refinements that get transport and store MethodxPorts in the abstractions, in the order they are written out
+TRANSPORTED_REFINEMENTS = ('electric power at 132kV', 'processed gas', 'syngas', 'raw gas', 'crude oil', 'processed oil',
+	'liquid biomass feedstock', 'solid biomass feedstock', 'coal', 'water energy', 'other')
+
+# Fuels that electric power is generated from, in the order their MethodPairs are written out
+GENERATION_FUELS = ('processed gas', 'processed oil', 'syngas', 'coal', 'uranium', 'solid biomass feedstock',
+	'liquid biomass feedstock', 'other', 'water energy', 'solar', 'wind energy')
+
+# MethodPairs (name1, ref1, name2, ref2) written to the abstractions for each system, in the order they are written out.
+# The electric power generation pairs of each fuel in GENERATION_FUELS are put before ELEC_METHOD_PAIRS in ELEC_METHOD_PAIR_ATTRIBS
+ELEC_METHOD_PAIRS = (
+	# ('generate electric power', '', 'store', 'electric power at 132kV'),
+	# ('generate electric power', '', 'transport', 'electric power at 132kV'),
+	# ('generate electric power', '', 'consume electric power', ''),
+	('transport', 'electric power at 132kV', 'transport', 'electric power at 132kV'),
+	('transport', 'electric power at 132kV', 'consume electric power', ''),
+	('transport', 'electric power at 132kV', 'store', 'electric power at 132kV'),
+	('store', 'electric power at 132kV', 'consume electric power', ''),
+	('store', 'electric power at 132kV', 'transport', 'electric power at 132kV'),
+	('store', 'electric power at 132kV', 'store', 'electric power at 132kV'),
+)
+
+NG_METHOD_PAIRS = (
+	('import raw gas', '', 'transport', 'raw gas'),
+	('import raw gas', '', 'store', 'raw gas'),
+	('transport', 'raw gas', 'transport', 'raw gas'),
+	('transport', 'raw gas', 'store', 'raw gas'),
+	('store', 'raw gas', 'store', 'raw gas'),
+	('store', 'raw gas', 'transport', 'raw gas'),
+	('transport', 'raw gas', 'compress raw gas', ''),
+	('compress raw gas', '', 'transport', 'raw gas'),
+	('transport', 'raw gas', 'process raw gas', ''),
+
+	('process raw gas', '', 'transport', 'processed gas'),
+	('import processed gas', '', 'transport', 'processed gas'),
+	('import processed gas', '', 'store', 'processed gas'),
+	('transport', 'processed gas', 'transport', 'processed gas'),
+	('transport', 'processed gas', 'store', 'processed gas'),
+	('store', 'processed gas', 'store', 'processed gas'),
+	('store', 'processed gas', 'transport', 'processed gas'),
+	('transport', 'processed gas', 'compress processed gas', ''),
+	('compress processed gas', '', 'transport', 'processed gas'),
+	# ('transport', 'processed gas', 'generate electric power', ''),
+	('transport', 'processed gas', 'generate electric power from processed gas', ''),
+	('transport', 'processed gas', 'export processed gas', ''),
+	('store', 'processed gas', 'export processed gas', ''),
+
+	('import syngas', '', 'transport', 'syngas'),
+	('import syngas', '', 'store', 'syngas'),
+	('transport', 'syngas', 'transport', 'syngas'),
+	('transport', 'syngas', 'store', 'syngas'),
+	('store', 'syngas', 'store', 'syngas'),
+	('store', 'syngas', 'transport', 'syngas'),
+	('transport', 'syngas', 'compress syngas', ''),
+	('compress syngas', '', 'transport', 'syngas'),
+	# ('transport', 'syngas', 'generate electric power', ''),
+	('transport', 'syngas', 'generate electric power from syngas', ''),
+)
+
+OIL_METHOD_PAIRS = (
+	('import crude oil', '', 'transport', 'crude oil'),
+	('transport', 'crude oil', 'transport', 'crude oil'),
+	('transport', 'crude oil', 'store', 'crude oil'),
+	('transport', 'crude oil', 'export crude oil', ''),
+	('transport', 'crude oil', 'process crude oil', ''),
+
+	('process crude oil', '', 'transport', 'processed oil'),
+	('import processed oil', '', 'transport', 'processed oil'),
+	('import processed oil', '', 'store', 'processed oil'),
+	# ('import processed oil', '', 'export processed oil', ''),
+	('transport', 'processed oil', 'transport', 'processed oil'),
+	('transport', 'processed oil', 'store', 'processed oil'),
+	# ('transport', 'processed oil', 'generate electric power', ''),
+	('transport', 'processed oil', 'generate electric power from processed oil', ''),
+	# ('store', 'processed oil', 'generate electric power', ''),
+	('store', 'processed oil', 'generate electric power from processed oil', ''),
+	('transport', 'processed oil', 'export processed oil', ''),
+	('store', 'processed oil', 'export processed oil', ''),
+
+	('import liquid biomass feedstock', '', 'transport', 'liquid biomass feedstock'),
+	('transport', 'liquid biomass feedstock', 'transport', 'processed oil'),
+	('transport', 'liquid biomass feedstock', 'store', 'liquid biomass feedstock'),
+	('transport', 'liquid biomass feedstock', 'export liquid biomass feedstock', ''),
+	# ('transport', 'liquid biomass feedstock', 'generate electric power', ''),
+	('transport', 'liquid biomass feedstock', 'generate electric power from liquid biomass feedstock', ''),
+	# ('store', 'liquid biomass feedstock', 'generate electric power', ''),
+	('store', 'liquid biomass feedstock', 'generate electric power from liquid biomass feedstock', ''),
+)
+
+COAL_METHOD_PAIRS = (
+	('import coal', '', 'transport', 'coal'),
+	('import coal', '', 'store', 'coal'),
+	('transport', 'coal', 'transport', 'coal'),
+	('transport', 'coal', 'store', 'coal'),
+	('transport', 'coal', 'generate electric power', ''),
+	('transport', 'coal', 'generate electric power from coal', ''),
+	('store', 'coal', 'transport', 'coal'),
+	('store', 'coal', 'store', 'coal'),
+	# ('store', 'coal', 'generate electric power', ''),
+	('store', 'coal', 'generate electric power from coal', ''),
+	('transport', 'coal', 'export coal', ''),
+	('store', 'coal', 'export coal', ''),
+)
+
+def methodPairAttribs(pairs):
+	"""
+	Builds the attribute dict of every MethodPair once so that each XML write can share them.
+
+	:param: pairs: iterable of (name1, ref1, name2, ref2) tuples
+	:return: tuple of MethodPair attribute dicts in the same order
+	"""
+	return tuple({'name1': name1, 'ref1': ref1, 'name2': name2, 'ref2': ref2} for name1, ref1, name2, ref2 in pairs)
+
+# MethodPair attributes of each system, the electric system leads with the generation pairs of every fuel
+ELEC_METHOD_PAIR_ATTRIBS = methodPairAttribs(
+	[('generate electric power from ' + fuel, '', name2, ref2) for fuel in GENERATION_FUELS
+		for name2, ref2 in (('store', 'electric power at 132kV'), ('transport', 'electric power at 132kV'), ('consume electric power', ''))]
+	+ list(ELEC_METHOD_PAIRS))
+NG_METHOD_PAIR_ATTRIBS = methodPairAttribs(NG_METHOD_PAIRS)
+OIL_METHOD_PAIR_ATTRIBS = methodPairAttribs(OIL_METHOD_PAIRS)
+COAL_METHOD_PAIR_ATTRIBS = methodPairAttribs(COAL_METHOD_PAIRS)
 
 class AMES(object):
 	"""
@@ -47,6 +246,8 @@ class AMES(object):
 		 coalSystem			Coal System
 		 nodes				List of all node objects in the AMES
 		 lines				List of all line objects in the AMES
+		 nodeGpsX			Array of the GPS X coordinate of each node, set once the nodes are final
+		 nodeGpsY			Array of the GPS Y coordinate of each node, set once the nodes are final
 		 refinements		List of all refinements
 	"""
 
@@ -60,12 +261,14 @@ class AMES(object):
 		self.NGSystem = None
 		self.oilSystem = None
 		self.coalSystem = None
-		self.nodes = np.array([None])
-		self.lines = np.array([None])
+		self.nodes = np.empty(0, dtype=object)
+		self.lines = np.empty(0, dtype=object)
+		self.nodeGpsX = np.empty(0)
+		self.nodeGpsY = np.empty(0)
 		self.refinements = []
 		self.regions = pd.DataFrame()
 		self.controlAreas = None
-		self.controllers = []
+		self.controllers = {}  # controller names in the order they are found
 
 	def __repr__(self):
 		"""
@@ -171,6 +374,37 @@ class AMES(object):
 
 		return self
 
+	def initialize_all(self, elecFiles=None, NGFiles=None, oilFiles=None, coalFiles=None, parallel=False):
+		"""
+		Instantiate the electric grid, NG system, oil system, and coal system.
+		A subsystem is skipped when its list of files is None.
+		With parallel the four initializers run on separate threads. Fiona and GDAL do not promise that
+		concurrent reads are thread safe, and the parsing after each read holds the GIL, so by default
+		they run one after another.
+
+		:param elecFiles: list of input file names for the electric grid
+		:param NGFiles: list of input file names for the NG system
+		:param oilFiles: list of input file names for the oil system
+		:param coalFiles: list of input file names for the coal system
+		:param parallel: boolean to run the initializers on separate threads
+		:return:
+		"""
+
+		systems = [(self.initialize_electric_grid, elecFiles), (self.initialize_NG_system, NGFiles),
+				   (self.initialize_Oil_system, oilFiles), (self.initialize_Coal_system, coalFiles)]
+		systems = [(initialize, files) for initialize, files in systems if files != None]
+		if not parallel:
+			for initialize, files in systems:
+				initialize(files)
+			return self
+
+		with ThreadPoolExecutor(max_workers=4) as executor:
+			futures = [executor.submit(initialize, files) for initialize, files in systems]
+			for future in futures:
+				future.result()
+
+		return self
+
 	def reviseAMES(self):
 		"""
 		Cluster and clean all buffers and endpoints in the AMES System.
@@ -206,6 +440,8 @@ class AMES(object):
 
 		clusters, resourceIdx = self.addIndBuffers(clusters, clustCenters, resourceIdx)
 
+		self.setNodeCoords()
+
 		self.setNodeStates()
 
 		self.setPipeODNames2(clusters, resourceIdx)
@@ -224,103 +460,45 @@ class AMES(object):
 		:return: ptsODY: matrix of line origin and destination Y coordinates of size OD points X refinements
 		"""
 		print('Entering get_all_pointsRef')
-		ptsBX = []
-		ptsBY = []
-		ptsODX = []
-		ptsODY = []
-		if self.elecGrid != None:
-			ptsBElecX, ptsBElecY, ptsODElecX, ptsODElecY = self.elecGrid.getPtsGPSRef()
-			for k1 in self.elecGrid.refinements:
-				if k1 not in self.refinements:
-					self.refinements.append(k1)
-
-		if self.NGSystem != None:
-			ptsBNGX, ptsBNGY, ptsODNGX, ptsODNGY = self.NGSystem.getPtsGPSRef()
-			for k1 in self.NGSystem.refinements:
-				if k1 not in self.refinements:
-					self.refinements.append(k1)
-
-		if self.oilSystem != None:
-			ptsBoilX, ptsBoilY, ptsODoilX, ptsODoilY = self.oilSystem.getPtsGPSRef()
-			for k1 in self.oilSystem.refinements:
-				if k1 not in self.refinements:
-					self.refinements.append(k1)
-
-		if self.coalSystem != None:
-			ptsBcoalX, ptsBcoalY, ptsODcoalX, ptsODcoalY = self.coalSystem.getPtsGPSRef()
-			for k1 in self.coalSystem.refinements:
-				if k1 not in self.refinements:
-					self.refinements.append(k1)
-
+		systems = []
 		if self.elecGrid != None:
-			tempBX = sp.lil_matrix((ptsBElecX.shape[0], len(self.refinements)))
-			tempBY = sp.lil_matrix((ptsBElecX.shape[0], len(self.refinements)))
-			tempODX = sp.lil_matrix((ptsODElecX.shape[0], len(self.refinements)))
-			tempODY = sp.lil_matrix((ptsODElecX.shape[0], len(self.refinements)))
-			for i, k1 in enumerate(self.elecGrid.refinements):
-				tempBX[:, self.refinements.index(k1)] = ptsBElecX[:, i]
-				tempBY[:, self.refinements.index(k1)] = ptsBElecY[:, i]
-				tempODX[:, self.refinements.index(k1)] = ptsODElecX[:, i]
-				tempODY[:, self.refinements.index(k1)] = ptsODElecY[:, i]
-
-			ptsBX = sp.vstack((ptsBX, tempBX))
-			ptsBY = sp.vstack((ptsBY, tempBY))
-			ptsODX = sp.vstack((ptsODX, tempODX))
-			ptsODY = sp.vstack((ptsODY, tempODY))
+			systems.append(self.elecGrid)
 
 		if self.NGSystem != None:
-			tempBX = sp.lil_matrix((ptsBNGX.shape[0], len(self.refinements)))
-			tempBY = sp.lil_matrix((ptsBNGX.shape[0], len(self.refinements)))
-			tempODX = sp.lil_matrix((ptsODNGX.shape[0], len(self.refinements)))
-			tempODY = sp.lil_matrix((ptsODNGX.shape[0], len(self.refinements)))
-			for i, k1 in enumerate(self.NGSystem.refinements):
-				tempBX[:, self.refinements.index(k1)] = ptsBNGX[:, i]
-				tempBY[:, self.refinements.index(k1)] = ptsBNGY[:, i]
-				tempODX[:, self.refinements.index(k1)] = ptsODNGX[:, i]
-				tempODY[:, self.refinements.index(k1)] = ptsODNGY[:, i]
-			ptsBX = sp.vstack((ptsBX, tempBX))
-			ptsBY = sp.vstack((ptsBY, tempBY))
-			ptsODX = sp.vstack((ptsODX, tempODX))
-			ptsODY = sp.vstack((ptsODY, tempODY))
+			systems.append(self.NGSystem)
 
 		if self.oilSystem != None:
-			tempBX = sp.lil_matrix((ptsBoilX.shape[0], len(self.refinements)))
-			tempBY = sp.lil_matrix((ptsBoilX.shape[0], len(self.refinements)))
-			tempODX = sp.lil_matrix((ptsODoilX.shape[0], len(self.refinements)))
-			tempODY = sp.lil_matrix((ptsODoilX.shape[0], len(self.refinements)))
-			for i, k1 in enumerate(self.oilSystem.refinements):
-				tempBX[:, self.refinements.index(k1)] = ptsBoilX[:, i]
-				tempBY[:, self.refinements.index(k1)] = ptsBoilY[:, i]
-				tempODX[:, self.refinements.index(k1)] = ptsODoilX[:, i]
-				tempODY[:, self.refinements.index(k1)] = ptsODoilY[:, i]
-			ptsBX = sp.vstack((ptsBX, tempBX))
-			ptsBY = sp.vstack((ptsBY, tempBY))
-			ptsODX = sp.vstack((ptsODX, tempODX))
-			ptsODY = sp.vstack((ptsODY, tempODY))
+			systems.append(self.oilSystem)
 
 		if self.coalSystem != None:
-			tempBX = sp.lil_matrix((ptsBcoalX.shape[0], len(self.refinements)))
-			tempBY = sp.lil_matrix((ptsBcoalX.shape[0], len(self.refinements)))
-			tempODX = sp.lil_matrix((ptsODcoalX.shape[0], len(self.refinements)))
-			tempODY = sp.lil_matrix((ptsODcoalX.shape[0], len(self.refinements)))
-			for i, k1 in enumerate(self.coalSystem.refinements):
-				tempBX[:, self.refinements.index(k1)] = ptsBcoalX[:, i]
-				tempBY[:, self.refinements.index(k1)] = ptsBcoalY[:, i]
-				tempODX[:, self.refinements.index(k1)] = ptsODcoalX[:, i]
-				tempODY[:, self.refinements.index(k1)] = ptsODcoalY[:, i]
-			ptsBX = sp.vstack((ptsBX, tempBX))
-			ptsBY = sp.vstack((ptsBY, tempBY))
-			ptsODX = sp.vstack((ptsODX, tempODX))
-			ptsODY = sp.vstack((ptsODY, tempODY))
-
-		ptsBX.row = ptsBX.row - 1
-		ptsBY.row = ptsBY.row - 1
-		ptsBX._shape = (ptsBX._shape[0] - 1, ptsBX._shape[1])
-		ptsBY._shape = (ptsBY._shape[0] - 1, ptsBY._shape[1])
-		ptsODX.row = ptsODX.row - 1
-		ptsODY.row = ptsODY.row - 1
-		ptsODX._shape = (ptsODX._shape[0] - 1, ptsODX._shape[1])
-		ptsODY._shape = (ptsODY._shape[0] - 1, ptsODY._shape[1])
+			systems.append(self.coalSystem)
+
+		systemPts = []
+		for system in systems:
+			systemPts.append(system.getPtsGPSRef())
+			self.refinements = list(dict.fromkeys(self.refinements + [sys.intern(str(k1)) for k1 in system.refinements]))
+
+		# gather the triplets of every subsystem and map their refinement columns onto the AMES refinements
+		refIdx = {k1: i for i, k1 in enumerate(self.refinements)}
+		ptsRef = []
+		for k2 in range(4):  # ptsBX, ptsBY, ptsODX, ptsODY
+			rows = []
+			cols = []
+			data = []
+			rowOffset = 0
+			for system, pts in zip(systems, systemPts):
+				colMap = np.array([refIdx[k1] for k1 in system.refinements], dtype=int)
+				temp = pts[k2].tocoo()
+				rows.append(temp.row + rowOffset)
+				cols.append(colMap[temp.col])
+				data.append(temp.data)
+				rowOffset += temp.shape[0]
+			rows = np.concatenate(rows)
+			cols = np.concatenate(cols)
+			data = np.concatenate(data)
+			order = np.lexsort((cols, rows))  # row major ordering of the points
+			ptsRef.append(sp.coo_matrix((data[order], (rows[order], cols[order])), shape=(rowOffset, len(self.refinements))))
+		ptsBX, ptsBY, ptsODX, ptsODY = ptsRef
 
 		return ptsBX, ptsBY, ptsODX, ptsODY
 
@@ -333,19 +511,13 @@ class AMES(object):
 		:return: An updated AMES Object with a populated nodes attribute
 		"""
 		print('Pulling all nodes')
-		if self.elecGrid != None:
-			self.nodes = np.hstack((self.nodes, self.elecGrid.get_all_nodes()))
+		nodes = [self.nodes]
+		for system in (self.elecGrid, self.NGSystem, self.oilSystem, self.coalSystem):
+			if system != None:
+				nodes.append(system.get_all_nodes())
 
-		if self.NGSystem != None:
-			self.nodes = np.hstack((self.nodes, self.NGSystem.get_all_nodes()))
-
-		if self.oilSystem != None:
-			self.nodes = np.hstack((self.nodes, self.oilSystem.get_all_nodes()))
-
-		if self.coalSystem != None:
-			self.nodes = np.hstack((self.nodes, self.coalSystem.get_all_nodes()))
-
-		self.nodes = np.delete(self.nodes, [0], 0)
+		self.nodes = np.concatenate(nodes)
+		self.internRefinements(self.nodes)
 		return self.nodes
 
 	def pull_all_lines(self):
@@ -357,22 +529,36 @@ class AMES(object):
 		:return: An updated AMES Object with a populated lines attribute
 		"""
 		print('Pulling all lines')
+		lines = [self.lines]
 		if self.elecGrid != None:
-			self.lines = np.hstack((self.lines, self.elecGrid.electricLine))
+			lines.append(self.elecGrid.electricLine)
 
 		if self.NGSystem != None:
-			self.lines = np.hstack((self.lines, self.NGSystem.NGPipe))
+			lines.append(self.NGSystem.NGPipe)
 
 		if self.oilSystem != None:
-			self.lines = np.hstack((self.lines, self.oilSystem.OilCrudePipe))
-			self.lines = np.hstack((self.lines, self.oilSystem.OilRefPipe))
+			lines.append(self.oilSystem.OilCrudePipe)
+			lines.append(self.oilSystem.OilRefPipe)
 
 		if self.coalSystem != None:
-			self.lines = np.hstack((self.lines, self.coalSystem.CoalRailroad))
+			lines.append(self.coalSystem.CoalRailroad)
 
-		self.lines = np.delete(self.lines, [0], 0)
+		self.lines = np.concatenate(lines)
+		self.internRefinements(self.lines)
 		return self.lines
 
+	def internRefinements(self, items):
+		"""
+		Swaps the refinement names of nodes or lines for interned strings, so the many membership tests on
+		refinement lists that follow are settled by the identity check instead of a string compare
+
+		:param items: The nodes or lines to update
+		:return:
+		"""
+		for item in items:
+			if isinstance(item.refinement, list):
+				item.refinement = [sys.intern(str(ref)) for ref in item.refinement]
+
 	def updateTransporters(self, resourcesToAdd, clusters, pts, ptsX, ptsY):
 		"""
 		Creates and adds lines to the AMES object as designated by the resourcesToAdd paramater.
@@ -388,122 +574,68 @@ class AMES(object):
 		:return: ptsY: An updated matrix of Y coordinates of size points X refinements
 		"""
 		print('Entering updateTransporters')
-		# Preallocate lists and counters
-		lines = []
-		clust = []
-		gps = []
-		rows = []
-		cols = []
-		dataX = []
-		dataY = []
-		count = 0
-		transmission_count = 0
-		NG_count = 0
-		oilRef_count = 0
-		oilCrude_count = 0
-		coal_count = 0
-		other_count = 0
+		lineCount = {}  # number of the last line named for each line name prefix
+
+		# keep only the lines whose refinement has a transporter
+		resourcesToAdd = np.array(resourcesToAdd, dtype=int).reshape(-1, 2)
+		handled = np.array([self.refinements[k1] in REF_TO_TRANSPORTER for k1 in ptsX.col[resourcesToAdd[:, 1]]], dtype=bool)
+		for k1 in np.unique(ptsX.col[resourcesToAdd[~handled, 1]]):
+			print('\nunhandled refinement in update transporters')
+			print(self.refinements[k1])
+		resourcesToAdd = resourcesToAdd[handled]
+		idxDest = resourcesToAdd[:, 0]
+		idxOrigin = resourcesToAdd[:, 1]
+		count = len(resourcesToAdd)
+		lines = np.empty(count, dtype=object)
+
+		# origin and destination points of the newly added lines
+		refCols = ptsX.col[idxOrigin]
+		originX = ptsX.data[idxOrigin]
+		originY = ptsY.data[idxOrigin]
+		destX = ptsX.data[idxDest]
+		destY = ptsY.data[idxDest]
+		originClust = clusters[idxOrigin]
+		destClust = clusters[idxDest]
 
 		# create new line to add based on refinement
-		for i, k1 in enumerate(resourcesToAdd):
-			ref = self.refinements[ptsX.col[k1[1]]]
-			if ref == 'electric power at 132kV':
-				transmission_count += 1
-				new_instance = ElectricLine()
-				if self.elecGrid != None:
-					new_instance.lineName = 'Transmission Line ' + str(
-						len(self.elecGrid.electricLine) + transmission_count)
-				else:
-					new_instance.lineName = 'Transmission Line ' + str(transmission_count)
-				new_instance.refinement = [ref]
-				new_instance.fuelType = [ref]
-				new_instance.attrib_ref = [ref]
-				new_instance.type = 'ElecLine'
-			elif ref == 'processed gas' or ref == 'syngas' or ref == 'raw gas':
-				NG_count += 1
-				new_instance = NGPipe()
-				if self.NGSystem != None:
-					new_instance.lineName = 'NG Pipeline ' + str(len(self.NGSystem.NGPipe) + NG_count)
-				else:
-					new_instance.lineName = 'NG Pipeline ' + str(NG_count)
-				new_instance.refinement = [ref]
-				new_instance.fuelType = [ref]
-				new_instance.attrib_ref = [ref]
-				new_instance.type = 'NGPipe'
-			elif ref == 'processed oil':
-				oilRef_count += 1
-				new_instance = OilRefPipe()
-				if self.oilSystem != None:
-					new_instance.lineName = 'OilR Pipeline ' + str(len(self.oilSystem.OilRefPipe) + oilRef_count)
-				else:
-					new_instance.lineName = 'OilR Pipeline ' + str(oilRef_count)
-				new_instance.refinement = [ref]
-				new_instance.fuelType = [ref]
-				new_instance.attrib_ref = [ref]
-				new_instance.type = 'oilRPipe'
-			elif ref == 'crude oil' or ref == 'liquid biomass feedstock' or ref == 'water energy':
-				oilCrude_count += 1
-				new_instance = OilCrudePipe()
-				if self.oilSystem != None:
-					new_instance.lineName = 'OilC Pipeline ' + str(len(self.oilSystem.OilCrudePipe) + oilCrude_count)
-				else:
-					new_instance.lineName = 'OilC Pipeline ' + str(oilCrude_count)
-				new_instance.refinement = [ref]
-				new_instance.fuelType = [ref]
-				new_instance.attrib_ref = [ref]
-				new_instance.type = 'oilCrudePipe'
-			elif ref == 'coal':
-				coal_count += 1
-				new_instance = CoalRailroad()
-				if self.coalSystem != None:
-					new_instance.lineName = 'coal railroad ' + str(len(self.coalSystem.CoalRailroad) + coal_count)
-				else:
-					new_instance.lineName = 'coal railroad ' + str(coal_count)
-				new_instance.refinement = [ref]
-				new_instance.fuelType = [ref]
-				new_instance.attrib_ref = [ref]
-				new_instance.type = 'railroad'
-			elif ref == 'other' or ref == 'solid biomass feedstock' or ref == 'uranium':
-				other_count += 1
-				new_instance = OilCrudePipe()
-				new_instance.lineName = 'Other Pipeline ' + str(other_count)
-				new_instance.refinement = [ref]
-				new_instance.fuelType = [ref]
-				new_instance.attrib_ref = [ref]
-				new_instance.type = 'otherPipe'
-			else:
-				print('\nunhandled refinement in update transporters')
-				print(ref)
+		for i in range(count):
+			ref = self.refinements[refCols[i]]
+			lineClass, lineName, lineType, system, systemLines = REF_TO_TRANSPORTER[ref]
+			if lineName not in lineCount:
+				lineCount[lineName] = 0
+				if system != None and getattr(self, system) != None:
+					lineCount[lineName] = len(getattr(getattr(self, system), systemLines))
+			lineCount[lineName] += 1
+			new_instance = lineClass()
+			new_instance.lineName = lineName + str(lineCount[lineName])
+			new_instance.refinement = [ref]
+			new_instance.fuelType = [ref]
+			new_instance.attrib_ref = [ref]
+			new_instance.type = lineType
 
 			# Set added line origin and destination
-			new_instance.fBus = (ptsX.data[k1[1]], ptsY.data[k1[1]])
-			new_instance.tBus = (ptsX.data[k1[0]], ptsY.data[k1[0]])
-			new_instance.fBus_gps = (ptsX.data[k1[1]], ptsY.data[k1[1]])
-			new_instance.tBus_gps = (ptsX.data[k1[0]], ptsY.data[k1[0]])
+			fBus = (originX[i], originY[i])
+			tBus = (destX[i], destY[i])
+			new_instance.fBus = fBus
+			new_instance.tBus = tBus
+			new_instance.fBus_gps = fBus
+			new_instance.tBus_gps = tBus
 			new_instance.status = 'true'
-			new_instance.clust_origin = clusters[k1[1]]
-			new_instance.clust_dest = clusters[k1[0]]
-			new_instance.attrib_origin = new_instance.fBus
-			new_instance.attrib_dest = new_instance.tBus
-
-			# Append to list of newly added lines
-			clust.append(new_instance.clust_origin)
-			clust.append(new_instance.clust_dest)
-			gps.append(new_instance.attrib_origin)
-			gps.append(new_instance.attrib_dest)
-			lines.append(new_instance)
-			rows.append(i * 2 + (len(self.lines) * 2))
-			rows.append(i * 2 + 1 + (len(self.lines) * 2))
-			cols.append(ptsX.col[k1[1]])
-			cols.append(ptsX.col[k1[1]])
-			dataX.append(ptsX.data[k1[1]])
-			dataX.append(ptsX.data[k1[0]])
-			dataY.append(ptsY.data[k1[1]])
-			dataY.append(ptsY.data[k1[0]])
-			count += 1
+			new_instance.clust_origin = originClust[i]
+			new_instance.clust_dest = destClust[i]
+			new_instance.attrib_origin = fBus
+			new_instance.attrib_dest = tBus
+			lines[i] = new_instance
+
+		rows = np.arange(count * 2) + len(self.lines) * 2
+		cols = np.repeat(refCols, 2)
+		dataX = np.stack([originX, destX], axis=1).ravel()
+		dataY = np.stack([originY, destY], axis=1).ravel()
+		clust = np.stack([originClust, destClust], axis=1).ravel()
+		gps = np.stack([dataX, dataY], axis=1)
 
 		if len(self.lines) > 0 and count > 0:  # If existing lines and lines to add
-			linePoints = np.where(ptsX.row == len(self.lines) * 2)[0][0]
+			linePoints = np.flatnonzero(ptsX.row >= len(self.lines) * 2)[0]  # first buffer point
 			clusters = np.insert(clusters, linePoints, clust)
 			pts = np.insert(pts, linePoints, gps, axis=0)
 			ptsX.row[linePoints:] = ptsX.row[linePoints:] + len(rows)
@@ -517,7 +649,7 @@ class AMES(object):
 			ptsY.col = np.insert(ptsY.col, linePoints, cols)
 			ptsY.data = np.insert(ptsY.data, linePoints, dataY)
 			ptsY._shape = (ptsY._shape[0] + len(rows), ptsY._shape[1])
-		self.lines = np.hstack((self.lines, lines))
+		self.lines = np.concatenate((self.lines, lines))
 
 		return clusters, pts, ptsX, ptsY
 
@@ -535,36 +667,23 @@ class AMES(object):
 		:return: ptsY: An updated matrix of Y coordinates of size points X refinements
 		"""
 		print('Entering deleteIsoNodes')
-		isoPoints = np.where(np.equal(clusters, None))[0]
-		isoResourcePoints = np.flip(pd.unique(ptsX.row[isoPoints]))
-		count = 0
-		for k1 in isoResourcePoints:
-			connected = False
-			isoPoint = np.flip(np.where(ptsX.row == k1)[0])
-			for k2 in isoPoint:
-				if clusters[k2] != None:
-					connected = True
-					continue
-				clusters = np.delete(clusters, k2)
-				pts = np.delete(pts, k2, axis=0)
-
-				ptsX.row = np.delete(ptsX.row, k2, 0)
-				ptsX.col = np.delete(ptsX.col, k2, 0)
-				ptsX.data = np.delete(ptsX.data, k2, 0)
-
-				ptsY.row = np.delete(ptsY.row, k2, 0)
-				ptsY.col = np.delete(ptsY.col, k2, 0)
-				ptsY.data = np.delete(ptsY.data, k2, 0)
-			if connected:
-				continue
-				print('not isolated')
-			elif k2 < len(ptsX.row):
-				ptsX.row[k2:] = ptsX.row[k2:] - 1
-				ptsY.row[k2:] = ptsY.row[k2:] - 1
-			count += 1
-			self.nodes = np.delete(self.nodes, k1 - len(self.lines) * 2)
-			ptsX._shape = (ptsX._shape[0] - 1, ptsX._shape[1])
-			ptsY._shape = (ptsY._shape[0] - 1, ptsY._shape[1])
+		isoPoints = np.equal(clusters, None)
+		# a resource is isolated when none of its points were clustered
+		isoResourcePoints = np.setdiff1d(ptsX.row[isoPoints], ptsX.row[~isoPoints])
+		count = len(isoResourcePoints)
+
+		# drop every unclustered point in one pass
+		keep = ~isoPoints
+		clusters = clusters[keep]
+		pts = pts[keep]
+		for ptsXY in (ptsX, ptsY):
+			ptsXY.row = ptsXY.row[keep]
+			ptsXY.col = ptsXY.col[keep]
+			ptsXY.data = ptsXY.data[keep]
+			# shift the remaining rows down by the number of isolated resources before them
+			ptsXY.row = ptsXY.row - np.searchsorted(isoResourcePoints, ptsXY.row)
+			ptsXY._shape = (ptsXY._shape[0] - count, ptsXY._shape[1])
+		self.nodes = np.delete(self.nodes, isoResourcePoints - len(self.lines) * 2)
 		print('deleted isolated nodes: %d' % count)
 
 		return ptsX, ptsY, pts, clusters
@@ -580,61 +699,65 @@ class AMES(object):
 		:return: resourceIdx: An updated list of length pts that designates each points resource
 		"""
 		print('In reviseCoords')
-		del_lines = []
+		nEP = len(self.lines) * 2
 		del_buffers = []
 
 		# set pipe and buffer coords to match pts coords (cluster midpoints)
-		numEndpoints = len(self.lines) * 2
-		countB = 0
-		countO = 0
-		isoCount = 0
-		for k1 in range(len(pts)):
-			if resourceIdx[k1] >= numEndpoints:  # Buffer
-				countB += 1
-				pt = self.nodes[resourceIdx[k1] - numEndpoints]
-				if pt.cluster == None:
-					pt.cluster = [clusters[k1]]
-				else:
-					pt.cluster.append(clusters[k1])
-				pt.gpsX = pts[k1][0]
-				pt.gpsY = pts[k1][1]
-			elif resourceIdx[k1] % 2 == 0:  # Line Origin
-				countO += 1
-				pt = self.lines[int(np.floor(resourceIdx[k1] / 2))]
-				pt.attrib_origin = pts[k1]
-				pt.clust_origin = clusters[k1]
-				self.lines[int(np.floor(resourceIdx[k1] / 2))] = pt
-			elif resourceIdx[k1] % 2 != 0:  # Line Destination
-				pt = self.lines[int(np.floor(resourceIdx[k1] / 2))]
-				pt.attrib_dest = pts[k1]
-				pt.clust_dest = clusters[k1]
-				self.lines[int(np.floor(resourceIdx[k1] / 2))] = pt
-				if pt.clust_origin == pt.clust_dest:
-					del_lines.append(int(np.floor(resourceIdx[k1] / 2)))
+		isBuffer = resourceIdx >= nEP
+		isOrigin = ~isBuffer & ((resourceIdx & 1) == 0)
+		isDest = ~isBuffer & ((resourceIdx & 1) == 1)
+		lineIdx = resourceIdx >> 1
+		bufferIdx = resourceIdx - nEP
+
+		for k1 in np.where(isBuffer)[0]:  # Buffer
+			pt = self.nodes[bufferIdx[k1]]
+			if pt.cluster == None:
+				pt.cluster = [clusters[k1]]
 			else:
-				print('Error matching points with resources.')
-
-		for k2 in np.flip(del_lines):  # remove self looping lines
-			clust = self.lines[k2].clust_origin
-			idxRemove = [k2*2+1,k2*2]
-			self.lines = np.delete(self.lines, k2)
-			clusters = np.delete(clusters, idxRemove)
-			resourceIdx = np.delete(resourceIdx, idxRemove)
-			resourceIdx[idxRemove[1]:] = resourceIdx[idxRemove[1]:]-2
-			temp = np.where(clusters == clust)[0]
-			if any(temp<len(self.lines)*2):
-				continue
-			else:
-				for k3 in temp:
-					del_buffers.append(resourceIdx[k3]-len(self.lines)*2)
-
-		del_buffers = np.unique(del_buffers)
-		for k3 in np.flip(del_buffers):  # Remove new isolated buffers
-			self.nodes = np.delete(self.nodes, k3)
-			temp1 = np.where(resourceIdx == k3 + len(self.lines)*2)[0]
-			clusters = np.delete(clusters, temp1)
-			resourceIdx = np.delete(resourceIdx, temp1)
-			resourceIdx[temp1[0]:] = resourceIdx[temp1[0]:] - 1
+				pt.cluster.append(clusters[k1])
+			pt.gpsX = pts[k1][0]
+			pt.gpsY = pts[k1][1]
+
+		clustOrigin = np.array([None] * len(self.lines))
+		clustDest = np.array([None] * len(self.lines))
+		for k1 in np.where(isOrigin)[0]:  # Line Origin
+			pt = self.lines[lineIdx[k1]]
+			pt.attrib_origin = pts[k1]
+			pt.clust_origin = clusters[k1]
+			clustOrigin[lineIdx[k1]] = clusters[k1]
+
+		for k1 in np.where(isDest)[0]:  # Line Destination
+			pt = self.lines[lineIdx[k1]]
+			pt.attrib_dest = pts[k1]
+			pt.clust_dest = clusters[k1]
+			clustDest[lineIdx[k1]] = clusters[k1]
+
+		del_lines = np.where(np.not_equal(clustDest, None) & np.equal(clustOrigin, clustDest))[0]
+
+		# remove self looping lines, and the buffers they leave without any line
+		keepLines = np.ones(len(self.lines), dtype=bool)
+		keepLines[del_lines] = False
+		keepPts = np.ones(len(resourceIdx), dtype=bool)
+		keepPts[~isBuffer] = keepLines[lineIdx[~isBuffer]]
+		lineClusts = set(clusters[~isBuffer & keepPts])
+		for clust in np.unique(clustOrigin[del_lines]):
+			if clust not in lineClusts:
+				temp = np.where((clusters == clust) & isBuffer)[0]
+				del_buffers.extend(bufferIdx[temp])
+
+		del_buffers = np.unique(del_buffers).astype(int)  # Remove new isolated buffers
+		keepNodes = np.ones(len(self.nodes), dtype=bool)
+		keepNodes[del_buffers] = False
+		keepPts[isBuffer] = keepNodes[bufferIdx[isBuffer]]
+
+		# renumber the remaining endpoints and buffers
+		newIdx = np.empty(len(resourceIdx), dtype=resourceIdx.dtype)
+		newIdx[~isBuffer] = (np.cumsum(keepLines) - 1)[lineIdx[~isBuffer]] * 2 + (resourceIdx[~isBuffer] & 1)
+		newIdx[isBuffer] = np.sum(keepLines) * 2 + (np.cumsum(keepNodes) - 1)[bufferIdx[isBuffer]]
+		clusters = clusters[keepPts]
+		resourceIdx = newIdx[keepPts]
+		self.lines = self.lines[keepLines]
+		self.nodes = self.nodes[keepNodes]
 
 		print('Deleted {} self looping lines'.format(len(del_lines)))
 		print('Deleted {} isolated nodes post self looping lines'.format(len(del_buffers)))
@@ -642,53 +765,39 @@ class AMES(object):
 
 	def condenseClusterBuffers(self, clusters, resourceIdx):
 		print('Condensing overlapping like nodes')
+		nEP = len(self.lines) * 2
 
-		uniClusts = np.unique(clusters)
-		for k1 in uniClusts:
-			foundClust = np.where(clusters == k1)[0]
+		# nodes are deleted once all clusters are condensed, so the cluster index stays valid
+		clusterIdx = getClusterIdx(clusters, 2)  # a single point has nothing to condense with
+		keepNodes = np.ones(len(self.nodes), dtype=bool)
+		nodeTypes = np.array([str(node.nodeType) for node in self.nodes])
+		for k1, foundClust in clusterIdx.items():
 			resources = resourceIdx[foundClust]
-			resources = resources[resources >= len(self.lines) * 2]
+			resources = resources[resources >= nEP]
+			resources = resources[keepNodes[resources - nEP]]
 			if len(resources) > 1:
-				nodeTypes = []
-				nodeIdxs = []
-				duplicates = []
-				for k2 in resources:
-					nodeIdx = k2 - (len(self.lines) * 2)
+				# the first node of each type in the cluster is kept, the later ones are its duplicates
+				nodeIdxs = resources - nEP
+				uniTypes, firstIdx, typeIdx = np.unique(nodeTypes[nodeIdxs], return_index=True, return_inverse=True)
+				isDuplicate = np.arange(len(nodeIdxs)) != firstIdx[typeIdx]
+				duplicates = nodeIdxs[isDuplicate]
+				primeIdxs = nodeIdxs[firstIdx[typeIdx]][isDuplicate]
+				for nodeIdx, primeIdx in zip(duplicates, primeIdxs):
 					currentNode = self.nodes[nodeIdx]
-					if currentNode.nodeType not in nodeTypes:
-						nodeTypes.append(currentNode.nodeType)
-						nodeIdxs.append(nodeIdx)
-					else:
-						temp = nodeTypes.index(currentNode.nodeType)
-						primeNode = self.nodes[nodeIdxs[temp]]
-						if primeNode.nodeType == 'GenC' or primeNode.nodeType == 'GenS':
-							duplicate = False
-							for k3, fuel in enumerate(primeNode.fuelType):
-								if fuel == currentNode.fuelType[0] and primeNode.cap[k3] == currentNode.cap[0]:
-									duplicate = True
-									break
-							if not duplicate:
-								primeNode.fuelType = primeNode.fuelType + currentNode.fuelType
-								primeNode.cap = primeNode.cap + currentNode.cap
-							duplicates.append(nodeIdx)
-						elif primeNode.nodeType == 'LoadC' or primeNode.nodeType == 'LoadS':
-							duplicates.append(nodeIdx)
-						elif primeNode.nodeType == 'NGProcessor':
-							duplicates.append(nodeIdx)
-						elif primeNode.nodeType == 'NGReceiptDelivery':
-							duplicates.append(nodeIdx)
-
-						else:
-							duplicates.append(nodeIdx)
-						primeNode.cluster = list(pd.unique(primeNode.cluster + currentNode.cluster))
-
-				if len(duplicates) > 0:
-					for k3 in np.flip(duplicates):
-						temp = np.flip(np.where(resourceIdx == k3 + (len(self.lines) * 2))[0])
-						clusters = np.delete(clusters, temp)
-						resourceIdx = np.delete(resourceIdx, temp)
-						self.nodes = np.delete(self.nodes, k3)
-						resourceIdx[temp[-1]:] = resourceIdx[temp[-1]:] - 1
+					primeNode = self.nodes[primeIdx]
+					if primeNode.nodeType == 'GenC' or primeNode.nodeType == 'GenS':
+						duplicate = False
+						for k3, fuel in enumerate(primeNode.fuelType):
+							if fuel == currentNode.fuelType[0] and primeNode.cap[k3] == currentNode.cap[0]:
+								duplicate = True
+								break
+						if not duplicate:
+							primeNode.fuelType = primeNode.fuelType + currentNode.fuelType
+							primeNode.cap = primeNode.cap + currentNode.cap
+					primeNode.cluster = list(dict.fromkeys(primeNode.cluster + currentNode.cluster))
+
+				keepNodes[duplicates] = False
+		clusters, resourceIdx = self.deleteMarkedNodes(clusters, resourceIdx, keepNodes)
 		return clusters, resourceIdx
 
 	def condenseBuffers(self, clusters, resourceIdx):
@@ -745,6 +854,26 @@ class AMES(object):
 							np.insert(resourceIdx, temp, primeResourceIdx[k4]+(len(self.lines)*2))
 		return clusters, resourceIdx
 
+	def deleteMarkedNodes(self, clusters, resourceIdx, keepNodes):
+		"""
+		Deletes the nodes that are not flagged in keepNodes along with their points
+
+		:param: clusters: A list of size # of points, designating each points cluster
+		:param: resourceIdx: a list of length pts that designates each points resource
+		:param: keepNodes: a boolean list of length nodes, flagging the nodes that are kept
+		:return: clusters: An updated list of size # of points, designating each points cluster
+		:return: resourceIdx: An updated list of length pts that designates each points resource
+		"""
+		nEP = len(self.lines) * 2
+		isBuffer = resourceIdx >= nEP
+		keep = ~isBuffer
+		keep[isBuffer] = keepNodes[resourceIdx[isBuffer] - nEP]
+		resourceIdx = resourceIdx.copy()
+		resourceIdx[isBuffer] = nEP + np.cumsum(keepNodes)[resourceIdx[isBuffer] - nEP] - 1
+		self.nodes = self.nodes[keepNodes]
+
+		return clusters[keep], resourceIdx[keep]
+
 	def joinLineSegs(self, clusters, resourceIdx):
 		"""
 		Join all lines that share endpoints with exactly one other line and no buffers
@@ -755,71 +884,105 @@ class AMES(object):
 		:return: resourceIdx: An updated list of length pts that designates each points resource
 		"""
 		print('In joinLineSegs')
+		nEP = len(self.lines) * 2
 		joined = 0
+
+		# lines and points are only marked as deleted while joining and removed in one pass at the end,
+		# so resourceIdx keeps the original resource numbering throughout the loop
+		liveLines = np.ones(len(self.lines), dtype=bool)
+		clustOrigin = np.array([None] * len(self.lines))
+		clustDest = np.array([None] * len(self.lines))
+		attribOrigin = np.array([None] * len(self.lines))
+		attribDest = np.array([None] * len(self.lines))
+		for k2, pipe in enumerate(self.lines):
+			clustOrigin[k2] = pipe.clust_origin
+			clustDest[k2] = pipe.clust_dest
+			attribOrigin[k2] = pipe.attrib_origin
+			attribDest[k2] = pipe.attrib_dest
+		livePts = np.ones(len(clusters), dtype=bool)
+		resourcePts = getClusterIdx(resourceIdx)
+		clusterPts = {}
+		for k2, pts in getClusterIdx(clusters).items():
+			clusterPts[k2] = set(pts)
+
+		def moveEndpoint(resource, clust):
+			for pt in resourcePts[resource]:
+				clusterPts[clusters[pt]].discard(pt)
+				clusterPts.setdefault(clust, set()).add(pt)
+				clusters[pt] = clust
+
+		def deleteLine(idxPipe):
+			for resource in (idxPipe * 2, idxPipe * 2 + 1):
+				for pt in resourcePts[resource]:
+					clusterPts[clusters[pt]].discard(pt)
+					livePts[pt] = False
+			liveLines[idxPipe] = False
+
 		k1 = 0
 		while k1 < len(self.lines):
-			pipe1 = self.lines[k1]
-			clust = np.where(clusters == pipe1.clust_origin)[0]  # clusters that match the origin
-			resources = np.unique(resourceIdx[clust])
+			if not liveLines[k1]:
+				k1 += 1
+				continue
+			clust = list(clusterPts.get(clustOrigin[k1], ()))  # points that match the origin
+			resources = np.unique(resourceIdx[clust]) if len(clust) > 1 else clust
 			if len(resources) == 2:
-				if all(resources < len(self.lines) * 2):
-					idxPipe2 = int(np.floor(resources[np.where(k1 * 2 != resources)[0]] / 2))
-					pipe2 = self.lines[idxPipe2]
-					if pipe1.clust_origin == pipe2.clust_dest and not pipe1.clust_dest == pipe2.clust_origin:  # origin 2 dest
-						pipe1.clust_origin = pipe2.clust_origin
-						pipe1.attrib_origin = pipe2.attrib_origin
-					elif pipe1.clust_origin == pipe2.clust_origin and not pipe1.clust_dest == pipe2.clust_dest:  # origin to origin
-						pipe1.clust_origin = pipe2.clust_dest
-						pipe1.attrib_origin = pipe2.attrib_dest
+				if all(resources < nEP):
+					idxPipe2 = resources[int(resources[0] == k1 * 2)] >> 1  # the other endpoint of the pair
+					if clustOrigin[k1] == clustDest[idxPipe2] and not clustDest[k1] == clustOrigin[idxPipe2]:  # origin 2 dest
+						clustOrigin[k1] = clustOrigin[idxPipe2]
+						attribOrigin[k1] = attribOrigin[idxPipe2]
+					elif clustOrigin[k1] == clustOrigin[idxPipe2] and not clustDest[k1] == clustDest[idxPipe2]:  # origin to origin
+						clustOrigin[k1] = clustDest[idxPipe2]
+						attribOrigin[k1] = attribDest[idxPipe2]
 					else:  # looping lines
 						k1 += 1
 						continue
-					clusters[np.where(resourceIdx == k1 * 2)[0]] = pipe1.clust_origin
-					idx2Del1 = np.where(resourceIdx == idxPipe2 * 2)[0]
-					clusters = np.delete(clusters, idx2Del1)
-					resourceIdx = np.delete(resourceIdx, idx2Del1)
-					idx2Del2 = np.where(resourceIdx == idxPipe2 * 2 + 1)[0]
-					clusters = np.delete(clusters, idx2Del2)
-					resourceIdx = np.delete(resourceIdx, idx2Del2)
-					if idxPipe2 * 2 + 1 < max(resourceIdx):
-						idx = np.where(resourceIdx == (idxPipe2 + 1) * 2)[0][0]
-						resourceIdx[idx:] = resourceIdx[idx:] - 2
-					self.lines[k1] = pipe1
-					self.lines = np.delete(self.lines, idxPipe2)
+					deleteLine(idxPipe2)
+					moveEndpoint(k1 * 2, clustOrigin[k1])
 					joined += 1
+					if idxPipe2 < k1:  # the line after pipe1 is the next to check
+						k1 += 1
 					continue
 
-			clust = np.where(clusters == pipe1.clust_dest)[0]  # clusters that match the destination
-			resources = np.unique(resourceIdx[clust])
+			clust = list(clusterPts.get(clustDest[k1], ()))  # points that match the destination
+			resources = np.unique(resourceIdx[clust]) if len(clust) > 1 else clust
 			if len(resources) == 2:
-				if all(resources < len(self.lines) * 2):
-					idxPipe2 = int(np.floor(resources[np.where(k1 * 2 + 1 != resources)[0]] / 2))
-					pipe2 = self.lines[idxPipe2]
-					if pipe1.clust_dest == pipe2.clust_dest and not pipe1.clust_origin == pipe2.clust_origin:  # dest to dest
-						pipe1.clust_dest = pipe2.clust_origin
-						pipe1.attrib_dest = pipe2.attrib_origin
-					elif pipe1.clust_dest == pipe2.clust_origin and not pipe1.clust_origin == pipe2.clust_dest:  # dest to origin
-						pipe1.clust_dest = pipe2.clust_dest
-						pipe1.attrib_dest = pipe2.attrib_dest
+				if all(resources < nEP):
+					idxPipe2 = resources[int(resources[0] == k1 * 2 + 1)] >> 1  # the other endpoint of the pair
+					if clustDest[k1] == clustDest[idxPipe2] and not clustOrigin[k1] == clustOrigin[idxPipe2]:  # dest to dest
+						clustDest[k1] = clustOrigin[idxPipe2]
+						attribDest[k1] = attribOrigin[idxPipe2]
+					elif clustDest[k1] == clustOrigin[idxPipe2] and not clustOrigin[k1] == clustDest[idxPipe2]:  # dest to origin
+						clustDest[k1] = clustDest[idxPipe2]
+						attribDest[k1] = attribDest[idxPipe2]
 					else:  # looping lines
 						k1 += 1
 						continue
-					clusters[np.where(resourceIdx == k1 * 2 + 1)[0]] = pipe1.clust_dest
-					idx2Del1 = np.where(resourceIdx == idxPipe2 * 2)[0]
-					clusters = np.delete(clusters, idx2Del1)
-					resourceIdx = np.delete(resourceIdx, idx2Del1)
-					idx2Del2 = np.where(resourceIdx == idxPipe2 * 2 + 1)[0]
-					clusters = np.delete(clusters, idx2Del2)
-					resourceIdx = np.delete(resourceIdx, idx2Del2)
-					if idxPipe2 * 2 + 1 < max(resourceIdx):
-						idx = np.where(resourceIdx == (idxPipe2 + 1) * 2)[0][0]
-						resourceIdx[idx:] = resourceIdx[idx:] - 2
-					self.lines[k1] = pipe1
-					self.lines = np.delete(self.lines, idxPipe2)
+					deleteLine(idxPipe2)
+					moveEndpoint(k1 * 2 + 1, clustDest[k1])
 					joined += 1
+					if idxPipe2 < k1:  # the line after pipe1 is the next to check
+						k1 += 1
 					continue
 
 			k1 += 1
+
+		# write the joined endpoints back to the lines
+		for k2 in np.where(liveLines)[0]:
+			pipe = self.lines[k2]
+			pipe.clust_origin = clustOrigin[k2]
+			pipe.clust_dest = clustDest[k2]
+			pipe.attrib_origin = attribOrigin[k2]
+			pipe.attrib_dest = attribDest[k2]
+
+		# renumber the remaining endpoints and buffers and drop the joined lines
+		isEndpoint = resourceIdx < nEP
+		lineRank = np.cumsum(liveLines) - 1
+		newIdx = resourceIdx - 2 * np.sum(~liveLines)
+		newIdx[isEndpoint] = lineRank[resourceIdx[isEndpoint] >> 1] * 2 + (resourceIdx[isEndpoint] & 1)
+		clusters = clusters[livePts]
+		resourceIdx = newIdx[livePts]
+		self.lines = self.lines[liveLines]
 		print('joined lines: %d' % joined)
 		return clusters, resourceIdx
 
@@ -838,90 +1001,29 @@ class AMES(object):
 		buffers = []
 		expanded_clusts = []
 		expanded_buffers = []
-		clustsU, returnIDX = np.unique(clusters, return_index=True)
-		for k1 in range(len(clustsU)):
-			clust = np.where(clusters == clustsU[k1])[0]
+		nLineEnds = len(self.lines) * 2
+		firstBuffer = resourceIdx.max() + 1
+		# the points of every cluster are grouped in one sort instead of a scan per cluster
+		clusterIdx = getClusterIdx(clusters)
+		clustsU = list(clusterIdx.keys())
+		for k1, clust in enumerate(clusterIdx.values()):
 			resources = np.unique(resourceIdx[clust])
-			if any(resources >= len(self.lines) * 2):  # if any clusters have nodes
+			if resources[-1] >= nLineEnds:  # if any clusters have nodes
 				continue
 			refinements = []
 			for k2 in resources:
-				idxPipe = int(np.floor(k2 / 2))
+				idxPipe = k2 >> 1
 				refinements.extend(self.lines[idxPipe].refinement)
 			refinements = np.unique(refinements)
 
-			if 'electric power at 132kV' in refinements:
-				new_instance = Bus()
-				new_instance.gpsX = clustCenters[k1][0]
-				new_instance.gpsY = clustCenters[k1][1]
-				new_instance.nodeName = 'IndBuffer ' + str(count)
-				new_instance.busName = 'IndBuffer ' + str(count)
-				new_instance.cluster = [clustsU[k1]]
-				new_instance.type = 'buffer'
-				new_instance.status = 'true'
-				new_instance.attrib_ref = refinements
-				buffers.append(new_instance)
-				expanded_clusts.append(clustsU[k1])
-				expanded_buffers.append(max(resourceIdx) + count + 1)
-				count += 1
-			elif 'processed gas' in refinements or 'syngas' in refinements or 'raw gas' in refinements:
-				new_instance = NGIndBuffer()
-				new_instance.gpsX = clustCenters[k1][0]
-				new_instance.gpsY = clustCenters[k1][1]
-				new_instance.nodeName = 'IndBuffer ' + str(count)
-				new_instance.busName = 'IndBuffer ' + str(count)
-				new_instance.cluster = [clustsU[k1]]
-				new_instance.type = 'buffer'
-				new_instance.status = 'true'
-				new_instance.attrib_ref = refinements
-				buffers.append(new_instance)
-				expanded_clusts.append(clustsU[k1])
-				expanded_buffers.append(max(resourceIdx) + count + 1)
-				count += 1
-			elif 'processed oil' in refinements or 'crude oil' in refinements or 'liquid biomass feedstock' in refinements or 'water energy' in refinements:
-				new_instance = OilIndBuffer()
-				new_instance.gpsX = clustCenters[k1][0]
-				new_instance.gpsY = clustCenters[k1][1]
-				new_instance.nodeName = 'IndBuffer ' + str(count)
-				new_instance.busName = 'IndBuffer ' + str(count)
-				new_instance.cluster = [clustsU[k1]]
-				new_instance.type = 'buffer'
-				new_instance.status = 'true'
-				new_instance.attrib_ref = refinements
-				buffers.append(new_instance)
-				expanded_clusts.append(clustsU[k1])
-				expanded_buffers.append(max(resourceIdx) + count + 1)
-				count += 1
-			elif 'solid biomass feedstock' in refinements:
-				new_instance = OilIndBuffer()
-				new_instance.gpsX = clustCenters[k1][0]
-				new_instance.gpsY = clustCenters[k1][1]
-				new_instance.nodeName = 'IndBuffer ' + str(count)
-				new_instance.busName = 'IndBuffer ' + str(count)
-				new_instance.cluster = [clustsU[k1]]
-				new_instance.type = 'buffer'
-				new_instance.status = 'true'
-				new_instance.attrib_ref = refinements
-				buffers.append(new_instance)
-				expanded_clusts.append(clustsU[k1])
-				expanded_buffers.append(max(resourceIdx) + count + 1)
-				count += 1
-			elif 'coal' in refinements:
-				new_instance = CoalIndBuffer()
-				new_instance.gpsX = clustCenters[k1][0]
-				new_instance.gpsY = clustCenters[k1][1]
-				new_instance.nodeName = 'IndBuffer ' + str(count)
-				new_instance.busName = 'IndBuffer ' + str(count)
-				new_instance.cluster = [clustsU[k1]]
-				new_instance.type = 'buffer'
-				new_instance.status = 'true'
-				new_instance.attrib_ref = refinements
-				buffers.append(new_instance)
-				expanded_clusts.append(clustsU[k1])
-				expanded_buffers.append(max(resourceIdx) + count + 1)
-				count += 1
-			elif 'other' in refinements:
-				new_instance = Bus()
+			refSet = set(refinements.tolist())
+			bufferClass = None
+			for refs, nodeClass in REF_TO_IND_BUFFER:
+				if refSet & refs:
+					bufferClass = nodeClass
+					break
+			if bufferClass != None:
+				new_instance = bufferClass()
 				new_instance.gpsX = clustCenters[k1][0]
 				new_instance.gpsY = clustCenters[k1][1]
 				new_instance.nodeName = 'IndBuffer ' + str(count)
@@ -932,7 +1034,7 @@ class AMES(object):
 				new_instance.attrib_ref = refinements
 				buffers.append(new_instance)
 				expanded_clusts.append(clustsU[k1])
-				expanded_buffers.append(max(resourceIdx) + count + 1)
+				expanded_buffers.append(firstBuffer + count)
 				count += 1
 			else:
 				print('Unhandled refinements in addIndBuffer')
@@ -959,127 +1061,65 @@ class AMES(object):
 		count = 0
 		verts = self.nodes
 		pipes = self.lines
-		delLine = []
+		keep = np.ones(len(pipes), dtype=bool)  # lines without an origin or dest are dropped at the end
+		clusterNodes = {}  # the nodes of each cluster, so each line only visits the nodes at its ends
+		for j, k2 in enumerate(verts):
+			for clust in k2.cluster:
+				clusterNodes.setdefault(clust, []).append(j)
 		for i, k1 in enumerate(pipes):
 			o = False
 			d = False
 			k1.controller = []
-			for j, k2 in enumerate(verts):
+			endNodes = sorted(set(clusterNodes.get(k1.clust_origin, []) + clusterNodes.get(k1.clust_dest, [])))
+			for k2 in verts[endNodes]:
 				if k1.clust_origin in k2.cluster and k2.nodeName not in k1.tBus:
 					if type(k1.fBus) == tuple:
 						k1.fBus = [k2.nodeName]
 					else:
 						k1.fBus.append(k2.nodeName)
 					o = True
-					for controller in k2.controller:
-						if controller not in k1.controller:
-							k1.controller.append(controller)
+					k1.controller = list(dict.fromkeys(k1.controller + k2.controller))
 				if k1.clust_dest in k2.cluster and k2.nodeName not in k1.fBus:
 					if type(k1.tBus) == tuple:
 						k1.tBus = [k2.nodeName]
 					else:
 						k1.tBus.append(k2.nodeName)
 					d = True
-					for controller in k2.controller:
-						if controller not in k1.controller:
-							k1.controller.append(controller)
+					k1.controller = list(dict.fromkeys(k1.controller + k2.controller))
 			if not o or not d:
 				if not o:
 					print('origin false')
 				if not d:
 					print('destination false')
 				count += 1
-				delLine.append(i)
-		for k3 in np.flip(delLine):
-			self.lines = np.delete(self.lines, k3)
+				keep[i] = False
+		self.lines = self.lines[keep]
 
 	def findClusterPrimary(self, lineType, nodeIdxs):
-		nodes = self.nodes[nodeIdxs]
-		primaryNode = None
-		primaryNodeType = None
-		primaryNodeIdx = None
-		if lineType == 'ElecLine':
-			for k1 in range(len(nodes)):
-				node = nodes[k1]
-				if node.nodeType == 'LoadC':
-					primaryNode = node
-					primaryNodeIdx = nodeIdxs[k1]
-					break
-				elif node.nodeType == 'LoadS':
-					primaryNode = node
-					primaryNodeType = node.nodeType
-					primaryNodeIdx = nodeIdxs[k1]
-				elif node.nodeType == 'GenC' and primaryNodeType != 'LoadS':
-					primaryNode = node
-					primaryNodeType = node.nodeType
-					primaryNodeIdx = nodeIdxs[k1]
-				elif node.nodeType == 'GenS'and primaryNodeType != 'LoadS' and primaryNodeType != 'GenC':
-					primaryNode = node
-					primaryNodeType = node.nodeType
-					primaryNodeIdx = nodeIdxs[k1]
-		elif lineType == 'NGPipe':
-			for k1 in range(len(nodes)):
-				node = nodes[k1]
-				if node.nodeType == 'NGReceiptDelivery':
-					primaryNode = node
-					primaryNodeIdx = nodeIdxs[k1]
-					break
-				elif node.nodeType == 'NGProcessor':
-					primaryNode = node
-					primaryNodeType = node.nodeType
-					primaryNodeIdx = nodeIdxs[k1]
-				elif node.nodeType == 'compressor'and primaryNodeType != 'NGProcessor':
-					primaryNode = node
-					primaryNodeType = node.nodeType
-					primaryNodeIdx = nodeIdxs[k1]
-				else:
-					primaryNode = node
-					primaryNodeType = node.nodeType
-					primaryNodeIdx = nodeIdxs[k1]
-		elif lineType == 'OilRefPipe':
-			for k1 in range(len(nodes)):
-				node = nodes[k1]
-				if node.nodeType == 'OilPort':
-					primaryNode = node
-					primaryNodeIdx = nodeIdxs[k1]
-					break
-				elif node.nodeType == 'OilTerminal':
-					primaryNode = node
-					primaryNodeType = node.nodeType
-					primaryNodeIdx = nodeIdxs[k1]
-				elif node.nodeType == 'OilRefinery' and primaryNodeType != 'OilTerminal':
-					primaryNode = node
-					primaryNodeType = node.nodeType
-					primaryNodeIdx = nodeIdxs[k1]
-		elif lineType == 'OilCrudePipe' or lineType == 'oilCPipe' or lineType == 'oilCrudePipe':
-			for k1 in range(len(nodes)):
-				node = nodes[k1]
-				if node.nodeType == 'OilPort':
-					primaryNode = node
-					primaryNodeIdx = nodeIdxs[k1]
-					break
-				elif node.nodeType == 'OilTerminal':
-					primaryNode = node
-					primaryNodeType = node.nodeType
-					primaryNodeIdx = nodeIdxs[k1]
-				elif node.nodeType == 'OilRefinery' and primaryNodeType != 'OilTerminal':
-					primaryNode = node
-					primaryNodeType = node.nodeType
-					primaryNodeIdx = nodeIdxs[k1]
-		elif lineType == 'CoalRailroad':
-			for k1 in range(len(nodes)):
-				node = nodes[k1]
-				if node.nodeType == 'CoalDock':
-					primaryNode = node
-					primaryNodeIdx = nodeIdxs[k1]
-					break
-				elif node.nodeType == 'CoalSource':
-					primaryNode = node
-					primaryNodeType = node.nodeType
-					primaryNodeIdx = nodeIdxs[k1]
-		else:
+		"""
+		Pick the node of a cluster that the lines of a type connect to
+
+		:param: lineType: The type of the line ending in the cluster
+		:param: nodeIdxs: The indices of the nodes in the cluster
+		:return: primaryNode: The primary node of the cluster
+		:return: primaryNodeIdx: The index of the primary node
+		"""
+		if lineType not in CLUSTER_PRIMARY_PRIORITY:
 			print('New line to handle: ' + lineType)
-		return primaryNode, primaryNodeIdx
+			return None, None
+		priority = CLUSTER_PRIMARY_PRIORITY[lineType]
+		nodes = self.nodes[nodeIdxs]
+		lastIdx = {}
+		for k1 in range(len(nodes)):
+			nodeType = nodes[k1].nodeType
+			if nodeType == priority[0]:
+				return nodes[k1], nodeIdxs[k1]
+			lastIdx[nodeType] = k1
+			lastIdx[None] = k1
+		for nodeType in priority[1:]:
+			if nodeType in lastIdx:
+				return nodes[lastIdx[nodeType]], nodeIdxs[lastIdx[nodeType]]
+		return None, None
 
 	def setPipeODNames2(self, clusters, resourceIdx):
 		"""
@@ -1092,69 +1132,55 @@ class AMES(object):
 		count = 0
 		verts = self.nodes
 		pipes = self.lines
-		delLine = []
+		keep = np.ones(len(pipes), dtype=bool)  # lines without an origin or dest are dropped at the end
 		clusterPrimary = {}
 		clusterRadialCenter = {}
-		for i, k1 in enumerate(pipes):
-			o = False
-			d = False
-			k1.controller = []
-			if k1.clust_origin not in clusterPrimary:
-				foundClustOrigin = np.where(clusters == k1.clust_origin)[0]
-				resourcesOrigin = resourceIdx[foundClustOrigin]
-				resourcesOrigin = resourcesOrigin[resourcesOrigin >= len(self.lines) * 2]
-				if len(resourcesOrigin) > 1:
-					primaryNode, primaryNodeIdx = self.findClusterPrimary(k1.type, resourcesOrigin - (len(self.lines) * 2))
-					clusterPrimary[k1.clust_origin] = primaryNode
-					k1.fBus = clusterPrimary[k1.clust_origin].nodeName
-					clusterRadialCenter[primaryNodeIdx] = (k1.type, k1.clust_origin)
-				else:
-					nodeIdx = resourcesOrigin - (len(self.lines) * 2)
-					clusterPrimary[k1.clust_origin] = verts[nodeIdx][0]
-					k1.fBus = clusterPrimary[k1.clust_origin].nodeName
-			else:
-				k1.fBus = clusterPrimary[k1.clust_origin].nodeName
-			for controller in clusterPrimary[k1.clust_origin].controller:
-				if controller not in k1.controller:
-					k1.controller.append(controller)
-
-			if k1.clust_dest not in clusterPrimary:
-				foundClustDest = np.where(clusters == k1.clust_dest)[0]
-				resourcesDest = resourceIdx[foundClustDest]
-				resourcesDest = resourcesDest[resourcesDest >= len(self.lines) * 2]
-				if len(resourcesDest) > 1:
-					primaryNode, primaryNodeIdx = self.findClusterPrimary(k1.type, resourcesDest - (len(self.lines) * 2))
-					clusterPrimary[k1.clust_dest] = primaryNode
-					k1.tBus = clusterPrimary[k1.clust_dest].nodeName
-					clusterRadialCenter[primaryNodeIdx] = (k1.type, k1.clust_dest)
+		nEP = len(self.lines) * 2
+		clusterNodes = {}  # node indices of each cluster, instead of scanning all clusters per line
+		for clust, pts in getClusterIdx(clusters).items():
+			resources = resourceIdx[pts]
+			clusterNodes[clust] = resources[resources >= nEP] - nEP
+
+		def getPrimary(cluster, lineType):
+			# the first line ending in a cluster picks its primary node, later lines reuse it
+			if cluster not in clusterPrimary:
+				nodeIdxs = clusterNodes[cluster]
+				if len(nodeIdxs) > 1:
+					primaryNode, primaryNodeIdx = self.findClusterPrimary(lineType, nodeIdxs)
+					clusterRadialCenter[primaryNodeIdx] = (lineType, cluster)
 				else:
-					nodeIdx = resourcesDest - (len(self.lines) * 2)
-					clusterPrimary[k1.clust_dest] = verts[nodeIdx][0]
-					k1.tBus = clusterPrimary[k1.clust_dest].nodeName
-			else:
-				k1.tBus = clusterPrimary[k1.clust_dest].nodeName
-			for controller in clusterPrimary[k1.clust_dest].controller:
-				if controller not in k1.controller:
-					k1.controller.append(controller)
+					primaryNode = verts[nodeIdxs[0]]
+				clusterPrimary[cluster] = primaryNode
+			return clusterPrimary[cluster]
+
+		for i, k1 in enumerate(pipes):
+			originNode = getPrimary(k1.clust_origin, k1.type)
+			destNode = getPrimary(k1.clust_dest, k1.type)
+			k1.fBus = originNode.nodeName
+			k1.tBus = destNode.nodeName
+			k1.controller = list(dict.fromkeys(originNode.controller + destNode.controller))
 
 			if type(k1.fBus) != type('') or type(k1.tBus) != type(''):
-				delLine.append(k1)
+				keep[i] = False
 				print('oh no! line without an origin or dest')
 
-		self.linkClusterBuffers(clusters, resourceIdx, clusterRadialCenter)
+		self.lines = self.lines[keep]
+		self.linkClusterBuffers(clusterNodes, clusterRadialCenter)
 
-		for k3 in np.flip(delLine):
-			self.lines = np.delete(self.lines, k3)
-
-	def linkClusterBuffers(self, clusters, resourceIdx, clusterRadialCenter):
+	def linkClusterBuffers(self, clusterNodes, clusterRadialCenter):
 		print('linking clustered nodes')
 
 		lines = []
-		transmission_count = 0
-		NG_count = 0
-		OilRefPipe_count = 0
-		OilCrudePipe_count = 0
-		Railroad_count = 0
+		connectorCount = {}
+
+		# one bit per refinement, so shared refinements are found with a single AND
+		refBits = {ref: 1 << k1 for k1, ref in enumerate(self.refinements)}
+
+		def getRefBits(refinements):
+			bits = 0
+			for ref in refinements:
+				bits |= refBits.setdefault(ref, 1 << len(refBits))
+			return bits
 
 		keys = list(clusterRadialCenter.keys())
 		for k1 in range(len(keys)):
@@ -1162,64 +1188,29 @@ class AMES(object):
 			primaryNode = self.nodes[primaryNodeIdx]
 			lineType = clusterRadialCenter[primaryNodeIdx][0]
 			cluster = clusterRadialCenter[primaryNodeIdx][1]
-			foundClust = np.where(clusters == cluster)[0]
-			clusterResources = resourceIdx[foundClust]
-			clusterResources = clusterResources[clusterResources >= len(self.lines) * 2]
-			for k2 in clusterResources:
-				nodeIdx = k2 - (len(self.lines) * 2)
+			if lineType not in LINE_TO_CONNECTOR:
+				print('line type not handled. need to handle: ' + lineType)
+				continue
+			lineClass, namePrefix, connectorType, fixedRef = LINE_TO_CONNECTOR[lineType]
+			if fixedRef == None:  # only clusters without a fixed refinement need the bitmask
+				primaryBits = getRefBits(primaryNode.refinement)
+			for nodeIdx in clusterNodes[cluster]:
 				if primaryNodeIdx != nodeIdx:
 					currentNode = self.nodes[nodeIdx]
-					if lineType == 'ElecLine':
-						if 'electric power at 132kV' in currentNode.refinement:
-							transmission_count += 1
-							new_instance = ElectricLine()
-							new_instance.lineName = 'Transmission Line Connector ' + str(transmission_count)
-							new_instance.refinement = ['electric power at 132kV']
-							new_instance.fuelType = ['electric power at 132kV']
-							new_instance.attrib_ref = ['electric power at 132kV']
-							new_instance.type = 'ElecLine'
-					elif lineType == 'NGPipe':
-						sharedRef = list(set(primaryNode.refinement) & set(currentNode.refinement))
-						if len(sharedRef)>0:
-							NG_count += 1
-							new_instance = NGPipe()
-							new_instance.lineName = 'NG Pipeline Connector ' + str(NG_count)
-							new_instance.refinement = sharedRef
-							new_instance.fuelType = sharedRef
-							new_instance.attrib_ref = sharedRef
-							new_instance.type = 'NGPipe'
-					elif lineType == 'OilRefPipe':
-						sharedRef = list(set(primaryNode.refinement) & set(currentNode.refinement))
-						if len(sharedRef)>0:
-							OilRefPipe_count += 1
-							new_instance = OilRefPipe()
-							new_instance.lineName = 'Refined Oil Pipeline Connector ' + str(OilRefPipe_count)
-							new_instance.refinement = sharedRef
-							new_instance.fuelType = sharedRef
-							new_instance.attrib_ref = sharedRef
-							new_instance.type = 'OilRefPipe'
-					elif lineType == 'OilCrudePipe' or lineType =='oilCrudePipe':
-						sharedRef = list(set(primaryNode.refinement) & set(currentNode.refinement))
-						if len(sharedRef)>0:
-							OilCrudePipe_count += 1
-							new_instance = OilCrudePipe()
-							new_instance.lineName = 'Crude Oil Pipeline Connector ' + str(OilCrudePipe_count)
-							new_instance.refinement = sharedRef
-							new_instance.fuelType = sharedRef
-							new_instance.attrib_ref = sharedRef
-							new_instance.type = 'OilCrudePipe'
-					elif lineType == 'CoalRailroad':
-						sharedRef = list(set(primaryNode.refinement) & set(currentNode.refinement))
-						if len(sharedRef)>0:
-							Railroad_count += 1
-							new_instance = CoalRailroad()
-							new_instance.lineName = 'Coal Railroad Connector ' + str(Railroad_count)
-							new_instance.refinement = sharedRef
-							new_instance.fuelType = sharedRef
-							new_instance.attrib_ref = sharedRef
-							new_instance.type = 'CoalRailroad'
+					if fixedRef != None:
+						sharedRef = list(fixedRef) if fixedRef[0] in currentNode.refinement else []
 					else:
-						print('line type not handled. need to handle: ' + lineType)
+						sharedBits = primaryBits & getRefBits(currentNode.refinement)
+						sharedRef = [ref for ref, bit in refBits.items() if sharedBits & bit]
+					if len(sharedRef) == 0:  # nothing the connector could carry
+						continue
+					connectorCount[namePrefix] = connectorCount.get(namePrefix, 0) + 1
+					new_instance = lineClass()
+					new_instance.lineName = namePrefix + str(connectorCount[namePrefix])
+					new_instance.refinement = sharedRef
+					new_instance.fuelType = sharedRef
+					new_instance.attrib_ref = sharedRef
+					new_instance.type = connectorType
 					new_instance.status = 'true'
 					new_instance.clust_origin = cluster
 					new_instance.clust_dest = cluster
@@ -1227,15 +1218,20 @@ class AMES(object):
 					new_instance.tBus = currentNode.nodeName
 					new_instance.attrib_origin = new_instance.fBus
 					new_instance.attrib_dest = new_instance.tBus
-					for controller in primaryNode.controller:
-						if controller not in new_instance.controller:
-							new_instance.controller.append(controller)
-					for controller in currentNode.controller:
-						if controller not in new_instance.controller:
-							new_instance.controller.append(controller)
+					new_instance.controller = list(dict.fromkeys(primaryNode.controller + currentNode.controller))
 					lines.append(new_instance)
 		self.lines = np.hstack((self.lines, lines))
 
+	def setNodeCoords(self):
+		"""
+		Gather the GPS coordinates of all nodes into arrays, once the nodes will no longer change.
+
+		:param: self: This takes itself in to set the node coordinates
+		:return:
+		"""
+		self.nodeGpsX = np.array([node.gpsX for node in self.nodes], dtype=float)
+		self.nodeGpsY = np.array([node.gpsY for node in self.nodes], dtype=float)
+
 	def setNodeStates(self):
 		"""
 		Set the region of each buffer to the state they belong too.
@@ -1247,15 +1243,21 @@ class AMES(object):
 			print('No Controller Regions')
 			return
 		count = 0
-		self.controllers = []
+		self.controllers = {}  # controller names in the order they are found
 		verts = self.nodes
-		all_states = self.regions['geometry']  # get all the polygons
+		all_states = self.getRegionShapes(self.regions['geometry'])  # get all the polygons
 		all_records = self.regions['STUSPS']
-		all_ISOs = self.controlAreas['geometry']
+		all_ISOs = self.getRegionShapes(self.controlAreas['geometry'])
 		all_ISO_records = self.controlAreas['ISO']
+		nodeX = self.nodeGpsX
+		nodeY = self.nodeGpsY
+		nodePts = gpd.points_from_xy(nodeX, nodeY)  # all node points at once
+		nodeStates = self.getRegionIdxs(nodeX, nodeY, all_states)
+		nodeISOs = self.getRegionIdxs(nodeX, nodeY, all_ISOs)
 		if hasattr(self, 'NGRegions'):
-			all_Regions = self.NGRegions['geometry']
+			all_Regions = self.getRegionShapes(self.NGRegions['geometry'])
 			all_Region_records = self.NGRegions['NAME']
+			nodeRegions = self.getRegionIdxs(nodeX, nodeY, all_Regions)
 		progress = 0
 		for i, k1 in enumerate(verts):
 			if progress == 1000:
@@ -1269,87 +1271,81 @@ class AMES(object):
 				if name != None:
 					stateAttrib = True
 					k1.controller.append(name)
-					if name not in self.controllers:
-						self.controllers.append(name)
+					self.controllers[name] = None
 			if not stateAttrib:
-				regionFound = False
-				coords = [k1.gpsX, k1.gpsY]
-				minDist = 999999
-				minIdx = 0
-				for j in range(len(all_states)):
-					boundary = all_states[j]  # get a boundary polygon
-					if Point(coords).within(shape(boundary)):  # make a point and see if it's in the polygon
-						name = all_records[j]  # get the second field of the corresponding record
-						k1.region = name
-						k1.controller.append(name)
-						if name not in self.controllers:
-							self.controllers.append(name)
-						regionFound = True
-						break
-					else:
-						dist = Point(coords).distance(shape(boundary))
-						if dist < minDist:
-							minDist = dist
-							minIdx = j
-				if not regionFound:
-					name = all_records[minIdx]  # get the second field of the corresponding record
-					k1.region = name
-					k1.controller.append(name)
-					if name not in self.controllers:
-						self.controllers.append(name)
+				j, regionFound = self.findRegionIdx(nodePts[i], all_states, nodeStates[i])
+				name = all_records[j]  # get the second field of the corresponding record
+				k1.region = name
+				k1.controller.append(name)
+				self.controllers[name] = None
 			if hasattr(k1, 'iso'):
 				if k1.iso !=None:
 					name = k1.iso
 					self.setISO(k1, name)
 				else:
-					coords = [k1.gpsX, k1.gpsY]
-					minDist = 999999
-					minIdx = 0
-					regionFound = False
-					for k2 in range(len(all_ISOs)):
-						boundary = all_ISOs[k2]  # get a boundary polygon
-						if Point(coords).within(shape(boundary)):  # make a point and see if it's in the polygon
-							name = all_ISO_records[k2]  # get the second field of the corresponding record
-							self.setISO(k1, name)
-							regionFound = True
-							break
-						else:
-							dist = Point(coords).distance(shape(boundary))
-							if dist < minDist:
-								minDist = dist
-								minIdx = k2
-					if not regionFound:
-						name = all_ISO_records[minIdx]  # get the second field of the corresponding record
-						self.setISO(k1, name)
+					k2, regionFound = self.findRegionIdx(nodePts[i], all_ISOs, nodeISOs[i])
+					name = all_ISO_records[k2]  # get the second field of the corresponding record
+					self.setISO(k1, name)
 			if k1.nodeType == "NGStorage":
 				if k1.region !=None:
 					name = k1.region
 					self.setRegion(k1, name)
 				else:
-					coords = [k1.gpsX, k1.gpsY]
-					minDist = 999999
-					minIdx = 0
-					regionFound = False
-					for k2 in range(len(all_Regions)):
-						boundary = all_Regions[k2]  # get a boundary polygon
-						if Point(coords).within(shape(boundary)):  # make a point and see if it's in the polygon
-							name = all_Region_records[k2]  # get the second field of the corresponding record
-							self.setRegion(k1, name)
-							regionFound = True
-							break
-						else:
-							dist = Point(coords).distance(shape(boundary))
-							if dist < minDist:
-								minDist = dist
-								minIdx = k2
-					if not regionFound:
-						name = all_Region_records[minIdx][2]  # get the second field of the corresponding record
-						self.setRegion(k1, name)
+					k2, regionFound = self.findRegionIdx(nodePts[i], all_Regions, nodeRegions[i])
+					if regionFound:
+						name = all_Region_records[k2]  # get the second field of the corresponding record
+					else:
+						name = all_Region_records[k2][2]  # get the second field of the corresponding record
+					self.setRegion(k1, name)
+
+	def getRegionShapes(self, boundaries):
+		"""
+		Convert region boundaries to shapely geometries once, reusing those that already are
+
+		:param: boundaries: The boundary of each region
+		:return: regions: A list of the region polygons
+		"""
+		return [boundary if hasattr(boundary, 'geom_type') else shape(boundary) for boundary in boundaries]
+
+	def getRegionIdxs(self, ptsX, ptsY, regions):
+		"""
+		Find the first region containing each point, testing all points against one polygon at a time
+
+		:param: ptsX: The x coordinates of the points
+		:param: ptsY: The y coordinates of the points
+		:param: regions: A list of the region polygons
+		:return: regionIdxs: The index of the first region containing each point, -1 if none do
+		"""
+		regionIdxs = np.full(len(ptsX), -1)
+		for j in range(len(regions)):
+			inRegion = shapely.vectorized.contains(regions[j], ptsX, ptsY) & (regionIdxs == -1)
+			regionIdxs[inRegion] = j
+		return regionIdxs
+
+	def findRegionIdx(self, point, regions, regionIdx):
+		"""
+		Find the region of a point, or the closest region when none contain it
+
+		:param: point: The point to place
+		:param: regions: A list of the region polygons
+		:param: regionIdx: The index of the first region containing the point, -1 if none do
+		:return: regionIdx: The index of the found region
+		:return: regionFound: True if the region contains the point
+		"""
+		if regionIdx != -1:
+			return regionIdx, True
+		minDist = 999999
+		minIdx = 0
+		for j in range(len(regions)):
+			dist = point.distance(regions[j])
+			if dist < minDist:
+				minDist = dist
+				minIdx = j
+		return minIdx, False
 
 	def setRegion(selfself, node, region):
 		node.controller.append(region)
-		if region not in self.controllers:
-			self.controllers.append(region)
+		self.controllers[region] = None
 
 	def setController(self, node, state):
 		"""
@@ -1411,8 +1407,7 @@ class AMES(object):
 		# 		self.controllers.append("DE")
 		# else:
 		node.controller.append(state)
-		if state not in self.controllers:
-			self.controllers.append(state)
+		self.controllers[state] = None
 
 	def setISO(self, node, ISO):
 		"""
@@ -1423,20 +1418,16 @@ class AMES(object):
 
 		if "NEW ENGLAND" in ISO or "ISONE" in ISO:
 			node.controller.append("ISONE")
-			if "ISONE" not in self.controllers:
-				self.controllers.append("ISONE")
+			self.controllers["ISONE"] = None
 		elif "NEW YORK" in ISO or "NYISO" in ISO:
 			node.controller.append("NYISO")
-			if "NYISO" not in self.controllers:
-				self.controllers.append("NYISO")
+			self.controllers["NYISO"] = None
 		elif "PJM" in ISO:
 			node.controller.append("PJM")
-			if "PJM" not in self.controllers:
-				self.controllers.append("PJM")
+			self.controllers["PJM"] = None
 		else:
 			node.controller.append(ISO)
-			if ISO not in self.controllers:
-				self.controllers.append(ISO)
+			self.controllers[ISO] = None
 
 	def reviseOil(self):
 		"""
@@ -1449,56 +1440,46 @@ class AMES(object):
 		:return: An updated AMES Object with cleaned data
 		"""
 		print('reviseOil')
+		nodeTypeIdxs = getClusterIdx(np.array([str(node.nodeType) for node in self.nodes]))  # node indices of each type
 		oilPowerPlantIdxs = []
-		oilOtherNodes = []
-		ptsXOther = []
-		ptsYOther = []
-		for k1 in range(len(self.nodes)):
-			if self.nodes[k1].nodeType == 'GenC' or self.nodes[k1].nodeType == 'GenS':
-				if 'processed oil' in self.nodes[k1].fuelType:
-					oilPowerPlantIdxs.append(k1)
-			elif self.nodes[k1].nodeType == 'OilIndBuffer' or self.nodes[k1].nodeType == 'OilPort' or self.nodes[k1].nodeType == 'OilTerminal':
-				oilOtherNodes.append(k1)
-				ptsXOther.append(self.nodes[k1].gpsX)
-				ptsYOther.append(self.nodes[k1].gpsY)
-		processedOilLines = []
-		for k2 in range(len(self.lines)):
-			if 'processed oil' in self.lines[k2].refinement:
-				processedOilLines.append(k2)
-
-		isoNodes = []
-		ptsXIso = []
-		ptsYIso = []
-		for k3 in range(len(oilPowerPlantIdxs)):
-			nodeName = self.nodes[oilPowerPlantIdxs[k3]].nodeName
-			found = False
-			for k4 in range(len(processedOilLines)):
-				if nodeName in self.lines[processedOilLines[k4]].fBus or nodeName in self.lines[processedOilLines[k4]].tBus:
-					found = True
-					break
-			if found != True:
-				isoNodes.append(oilPowerPlantIdxs[k3])
-				ptsXIso.append(self.nodes[oilPowerPlantIdxs[k3]].gpsX)
-				ptsYIso.append(self.nodes[oilPowerPlantIdxs[k3]].gpsY)
+		for k1 in self.getNodeTypeIdxs(nodeTypeIdxs, ['GenC', 'GenS']):
+			if 'processed oil' in self.nodes[k1].fuelType:
+				oilPowerPlantIdxs.append(k1)
+		oilOtherNodes = self.getNodeTypeIdxs(nodeTypeIdxs, ['OilIndBuffer', 'OilPort', 'OilTerminal'])
+		processedOilEnds = set()  # names of the nodes at either end of a processed oil line
+		for line in self.lines:
+			if 'processed oil' in line.refinement:
+				for bus in (line.fBus, line.tBus):
+					if type(bus) == str:
+						processedOilEnds.add(bus)
+					else:
+						processedOilEnds.update(bus)
+
+		isoNodes = [k3 for k3 in oilPowerPlantIdxs if self.nodes[k3].nodeName not in processedOilEnds]
 
 		print('starting isolated Oil powerplant clustering algorithem...')
 		eps = 0.5075*4  # = 35*2 miles (tertiary Clustering Radius for adding lines)
-		ptsXIso = np.array(ptsXIso)
-		ptsYIso = np.array(ptsYIso)
-		ptsXOther = np.array(ptsXOther)
-		ptsYOther = np.array(ptsYOther)
+		ptsXIso = self.nodeGpsX[np.array(isoNodes, dtype=int)]
+		ptsYIso = self.nodeGpsY[np.array(isoNodes, dtype=int)]
+		ptsXOther = self.nodeGpsX[np.array(oilOtherNodes, dtype=int)]
+		ptsYOther = self.nodeGpsY[np.array(oilOtherNodes, dtype=int)]
 		clusters = np.array([None] * len(ptsXIso))
 		clust = 0
 
 		print('creating primary cluster')
+		# only the other nodes the KD-tree finds near each isolated node are measured exactly
+		otherTree = cKDTree(np.column_stack((ptsXOther, ptsYOther)))
+		nearOther = otherTree.query_ball_point(np.column_stack((ptsXIso, ptsYIso)), eps * (1 + 1e-9))
 		stillIsoNode = []
+		newLines = []
 		oilRef_count = 0
 		for k1 in range(len(isoNodes)):
-			distances = ((ptsXIso[k1] - ptsXOther) ** 2 + (
-					ptsYIso[k1] - ptsYOther) ** 2) ** 0.5
-			found = np.where(distances <= eps)[0]
+			near = np.sort(np.array(nearOther[k1], dtype=int))
+			distances = ((ptsXIso[k1] - ptsXOther[near]) ** 2 + (
+					ptsYIso[k1] - ptsYOther[near]) ** 2) ** 0.5
+			found = near[distances <= eps]
 			if any(found):
-				found_dist = distances[found]
+				found_dist = distances[distances <= eps]
 				closest_dist = np.argmin(found_dist)
 				closest_node = oilOtherNodes[found[closest_dist]]
 				#### create transportation resource to transporting oil to power plants
@@ -1522,17 +1503,24 @@ class AMES(object):
 				new_instance.attrib_origin = new_instance.fBus
 				new_instance.attrib_dest = new_instance.tBus
 				new_instance.controller = []
-				for controller in self.nodes[closest_node].controller:
-					if controller not in new_instance.controller:
-						new_instance.controller.append(controller)
-				for controller in self.nodes[isoNodes[k1]].controller:
-					if controller not in new_instance.controller:
-						new_instance.controller.append(controller)
-				self.lines = np.append(self.lines,new_instance)
+				new_instance.controller = list(dict.fromkeys(new_instance.controller + self.nodes[closest_node].controller + self.nodes[isoNodes[k1]].controller))
+				newLines.append(new_instance)
 			else:
 				stillIsoNode.append(isoNodes[k1])
+		self.lines = np.hstack((self.lines, newLines))
 		print(len(stillIsoNode))
 
+	def getNodeTypeIdxs(self, nodeTypeIdxs, nodeTypes):
+		"""
+		Gather the indices of all nodes of the given types.
+
+		:param: nodeTypeIdxs: A dictionary of each node type to the indices of its nodes
+		:param: nodeTypes: A list of the node types to gather
+		:return: nodeIdxs: The indices of the nodes of those types, in ascending order
+		"""
+		nodeIdxs = [nodeTypeIdxs[nodeType] for nodeType in nodeTypes if nodeType in nodeTypeIdxs]
+		return np.sort(np.concatenate(nodeIdxs)) if len(nodeIdxs) > 0 else np.empty(0, dtype=int)
+
 	def write_xml_hfgt(self, fileout):
 		"""
 		Creates the HFGT compliant XML file to save the cleaned and organized data.
@@ -1544,25 +1532,46 @@ class AMES(object):
 		print('Generating HFGT XML tree ...')
 
 		# This is the root of the ETree where all the information branches from
-		root = ET.Element('LFES', OrderedDict([('name', self.name), ('type', 'Energy System'), ('dataState', 'raw')]))
+		root = ET.Element('LFES', {'name': self.name, 'type': 'Energy System', 'dataState': 'raw'})
+		rootTags = ET.tostring(root, encoding='unicode', short_empty_elements=False)
+		rootEnd = '</' + root.tag + '>'
 
-		for k1 in self.refinements:
-			operand = ET.SubElement(root, 'Operand', OrderedDict([('name', k1)]))
+		# each branch is written out as soon as it is built, so the whole tree is never held in memory
+		print('Writing HFGT XML file "{}"...'.format(fileout))
+		with open(fileout, 'wb') as xmlFile:
+			xmlFile.write("<?xml version='1.0' encoding='utf-8'?>\n".encode('utf-8'))
+			xmlFile.write(rootTags[:-len(rootEnd)].encode('utf-8'))
 
-		for node in self.nodes:
-			node.add_xml_child_hfgt(root)
-		for line in self.lines:
-			line.add_xml_child_hfgt(root)
+			root.extend([ET.Element('Operand', {'name': k1}) for k1 in self.refinements])
+			self.write_xml_branches(xmlFile, root)
 
-		self.add_xml_controllers(root)
+			for node in self.nodes:
+				node.add_xml_child_hfgt(root)
+				self.write_xml_branches(xmlFile, root)
+			for line in self.lines:
+				line.add_xml_child_hfgt(root)
+				self.write_xml_branches(xmlFile, root)
 
-		self.add_xml_services(root)
+			self.add_xml_controllers(root)
 
-		self.add_xml_abstraction_hfgt(root)
-		tree = ET.ElementTree(root)
+			self.add_xml_services(root)
 
-		print('Writing HFGT XML file "{}"...'.format(fileout))
-		tree.write(fileout, encoding='utf-8', xml_declaration=True)
+			self.add_xml_abstraction_hfgt(root)
+			self.write_xml_branches(xmlFile, root)
+
+			xmlFile.write(rootEnd.encode('utf-8'))
+
+	def write_xml_branches(self, xmlFile, root):
+		"""
+		Write the branches built so far under the root to an open XML file and drop them from the tree.
+
+		:param: xmlFile: The XML file, opened in binary mode
+		:param: root: The root of the ETree
+		:return:
+		"""
+		for branch in root:
+			ET.ElementTree(branch).write(xmlFile, encoding='utf-8')
+		del root[:]
 
 	def write_xml_hfgt_dofs(self, fileout):
 		"""
@@ -1575,18 +1584,21 @@ class AMES(object):
 		print('Generating HFGT XML tree DOFs...')
 
 		# This is the root of the ETree where all the information branches from
-		root = ET.Element('LFES', OrderedDict([('name', self.name), ('type', 'Energy System'), ('dataState', 'raw'), ('numBuffers', str(len(self.nodes)))]))
+		root = ET.Element('LFES', {'name': self.name, 'type': 'Energy System', 'dataState': 'raw', 'numBuffers': str(len(self.nodes))})
 
 		print('gathering operands')
 		print(self.refinements)
-		for k1 in self.refinements:
-			operand = ET.SubElement(root, 'Operand', OrderedDict([('name', k1)]))
+		root.extend([ET.Element('Operand', {'name': k1}) for k1 in self.refinements])
 
-		resourceCount = [0, 0, 0]
+		# independent buffers are numbered after all the transformation resources
+		numTransformations = sum(not isinstance(node, IND_BUFFER_CLASSES) for node in self.nodes)
+		resourceCount = [0, numTransformations, 0]
 		resourceIdx = {}
 		print('gathering nodes')
 		for node in self.nodes:
 			[resourceCount, resourceIdx] = node.add_xml_child_hfgt_dofs(root, resourceCount, resourceIdx)
+		# lines number themselves from sum(resourceCount), so resourceCount[1] goes back to the buffer count alone
+		resourceCount[1] -= numTransformations
 
 		print('gathering lines')
 		for line in self.lines:
@@ -1601,588 +1613,129 @@ class AMES(object):
 		print('gathering abstraction')
 		self.add_xml_abstraction_hfgt(root)
 
-		print('Starting regular expression')
-		xmlString = tostring(root, encoding='unicode', method='xml')
-
-		print('Starting RE: IndBuffers')
-		# set IndBuffer resource idx
-		buffers = re.compile("indBuff'.*?'")
-		indValue = re.compile("'.*?'")
-		foundBuffer = buffers.findall(xmlString)
-		uniBuffer = pd.unique(foundBuffer)
-		for b1 in range(len(uniBuffer)):
-			buff = indValue.search(uniBuffer[b1]).group()[1:-1]
-			xmlString = re.sub(uniBuffer[b1], str(int(buff)+resourceCount[0]), xmlString)
-
-		print('Starting RE: Opperands')
-		# Set opperands to idx
-		operands = re.compile('<Operand name=".*?"')
-		value = re.compile('".*?"')
-		foundOperand = operands.findall(xmlString)
-		uniOperand = pd.unique(foundOperand)
-		for k1 in range(len(uniOperand)):
-			oper = value.search(uniOperand[k1]).group()[1:-1]
-			xmlString = re.sub('Operand name="' + oper, 'Operand name="' + str(k1), xmlString)
-			xmlString = re.sub('operand="' + oper, 'operand="' + str(k1), xmlString)
-			xmlString = re.sub('output="' + oper, 'output="' + str(k1), xmlString)
-			xmlString = re.sub(', ' + oper, ', ' + str(k1), xmlString)
-
-		print('Starting RE: Refinements')
-		# set Refinements to idx
-		Abstraction = re.compile(r"<Abstractions>.*?/Abstractions>", re.DOTALL)
-		refinement = re.compile('ref=".*?"')
-		foundAbs = Abstraction.findall(xmlString)[0]
-		foundRef = refinement.findall(foundAbs)
-		uniRef = pd.unique(foundRef)
-		for k1 in range(len(uniRef)):
-			xmlString = re.sub(uniRef[k1], 'ref="' + str(k1) + '"', xmlString)
-			xmlString = re.sub('ref1=' + value.search(uniRef[k1]).group(), 'ref1="' + str(k1) + '"', xmlString)
-			xmlString = re.sub('ref2=' + value.search(uniRef[k1]).group(), 'ref2="' + str(k1) + '"', xmlString)
-			xmlString = re.sub('methodLinkRef=' + value.search(uniRef[k1]).group(), 'methodLinkRef="' + str(k1) + '"',xmlString)
-
-		print('Starting RE: Controllers')
-		# set controllers to idx
-		controllers = re.compile('<Controller name=".*?"')
-		foundCont = controllers.findall(xmlString)
-		for k1 in range(len(foundCont)):
-			control = value.search(foundCont[k1]).group()[1:-1]
-			print(control + ' : ' + str(k1))
-			xmlString = re.sub('"' + control + '"', '"' + str(k1) + '"', xmlString)
-			xmlString = re.sub('"' + control + ',', '"' + str(k1) + ',', xmlString)
-			xmlString = re.sub(', ' + control + ',', ', ' + str(k1) + ',', xmlString)
-			xmlString = re.sub(', ' + control + '"', ', ' + str(k1) + '"', xmlString)
-			xmlString = re.sub(foundCont[k1][0:18] + str(k1) + '"', foundCont[k1][0:18] + str(k1) + '" nameStr="' + control + '"', xmlString)
-
-		print('Starting RE: MethodxForm')
-		methodxForm = re.compile('\<MethodxForm .*?\>')
-		foundMF = methodxForm.findall(xmlString)
-		concatenated_strings = "".join(foundMF)
-		name = re.compile('name=".*?"')
-		foundMXFName = name.findall(concatenated_strings)
-		uniMXF = pd.unique(foundMXFName)
-		for k1 in range(len(uniMXF)):
-			xmlString = re.sub(uniMXF[k1], uniMXF[k1] + ' idxProc="' + str(k1) + '" ', xmlString)
-			proc = value.search(uniMXF[k1]).group()
-			xmlString = re.sub('name1=' + proc, 'name1="' + str(k1) + '"', xmlString)
-			xmlString = re.sub('name2=' + proc, 'name2="' + str(k1) + '"', xmlString)
-			xmlString = re.sub('methodLinkName=' + proc, 'methodLinkIdx="' + str(k1) + '" methodLinkName=' + proc, xmlString)
-		if not k1:
-			k1 = -1
-		xmlString = re.sub('methodLinkName="transport"', 'methodLinkIdx="' + str(k1 + 1) + '" methodLinkName="transport"',xmlString)
-		xmlString = re.sub('methodLinkName="store"', 'methodLinkIdx="' + str(k1 + 1) + '" methodLinkName="store"', xmlString)
-
-		print('Compiling tree before writing to XML file')
-		root = ET.fromstring(xmlString)
+		self.index_xml_dofs(root)
 		tree = ET.ElementTree(root)
 
 		print('Writing HFGT XML file "{}"...'.format(fileout))
 		tree.write(fileout, encoding='utf-8', xml_declaration=True)
 
+	def index_xml_dofs(self, root):
+		"""
+		Replace the operand, refinement, controller and process names of the DOFs tree with their indices.
+		The operand and controller indices follow the AMES refinements and controllers the tree was written from,
+		so every attribute is rewritten in a single walk of the tree.
+
+		:param: root: The root of the ETree
+		:return:
+		"""
+		print('Indexing names')
+		operandIdx = {ref: str(k1) for k1, ref in enumerate(self.refinements)}
+		refIdx = {}
+		for elem in root.find('Abstractions').iter():
+			if elem.get('ref') != None:
+				refIdx.setdefault(elem.get('ref'), str(len(refIdx)))
+		controllerIdx = {}
+		for k1, controller in enumerate(self.controllers):
+			print(controller + ' : ' + str(k1))
+			controllerIdx[controller] = str(k1)
+
+		# operands start the operand and output attributes and follow every comma of a list
+		operandAlts = '(' + '|'.join(map(re.escape, operandIdx)) + ')'
+		leadingOperand = re.compile('(^|, )' + operandAlts)
+		listedOperand = re.compile('(, )' + operandAlts)
+		replaceOperand = lambda m: m.group(1) + operandIdx[m.group(2)]
+		# a controller is either a whole attribute value or an item of a comma separated list
+		listedControllerIdx = {' ' + controller: ' ' + idx for controller, idx in controllerIdx.items()}
+
+		def indexValue(tag, key, val):
+			if len(operandIdx) > 0:
+				if key in ('operand', 'output') or (key == 'name' and tag == 'Operand'):
+					val = leadingOperand.sub(replaceOperand, val)
+				elif ', ' in val:
+					val = listedOperand.sub(replaceOperand, val)
+			if key in ('ref', 'ref1', 'ref2', 'methodLinkRef') and val in refIdx:
+				val = refIdx[val]
+			if val in controllerIdx:
+				val = controllerIdx[val]
+			elif ',' in val:
+				# items after the first are preceded by a space
+				items = val.split(',')
+				items[0] = controllerIdx.get(items[0], items[0])
+				for k1 in range(1, len(items)):
+					items[k1] = listedControllerIdx.get(items[k1], items[k1])
+				val = ','.join(items)
+			return val
+
+		procIdx = {}
+		for proc in root.iter('MethodxForm'):
+			procIdx.setdefault(indexValue(proc.tag, 'name', proc.get('name')), str(len(procIdx)))
+		# transport and store come after all the transformation processes
+		linkIdx = dict(procIdx, transport=str(len(procIdx)), store=str(len(procIdx)))
+
+		for elem in root.iter():
+			# attributes are written in insertion order, so added attributes are placed next to the one they describe
+			attribs = []
+			for key, val in elem.items():
+				nameStr = val
+				val = indexValue(elem.tag, key, val)
+				if key == 'methodLinkName' and val in linkIdx:
+					attribs.append(('methodLinkIdx', linkIdx[val]))
+				if key in ('name1', 'name2') and val in procIdx:
+					val = procIdx[val]
+				attribs.append((key, val))
+				if key == 'name' and val in procIdx:
+					attribs.append(('idxProc', procIdx[val]))
+				if key == 'name' and elem.tag == 'Controller':
+					attribs.append(('nameStr', nameStr))
+			elem.attrib.clear()
+			for key, val in attribs:
+				elem.set(key, val)
+
 	def add_xml_controllers(self, root):
-		print(self.controllers)
+		print(list(self.controllers))
 		for k1 in self.controllers:
-			controller = ET.SubElement(root, 'Controller', OrderedDict([('name', k1), ('status', 'true')]))
-			if k1 == "ISONE":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "ME")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NH")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "VT")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MA")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "CT")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "RI")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NYISO")]))
-			elif k1 == "NYISO":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NY")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "ISONE")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "PJM")]))
-			elif k1 == "CAISO":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "CA")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NWISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SWISO")]))
-			elif k1 == "NWISO":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "CA")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "WA")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "OR")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "ID")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MT")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "WY")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "UT")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "CO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "CAISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SWISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SPP")]))
-			elif k1 == "SWISO":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NV")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "AZ")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NM")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "CAISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NWISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SPP")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "ERCOT")]))
-			elif k1 == "ERCOT":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "TX")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SWISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SPP")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MISO")]))
-			elif k1 == "SPP":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "ND")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SD")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NE")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "KS")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "OK")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "TX")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MT")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "AR")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "ERCOT")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SWISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NWISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MISO")]))
-			elif k1 == "MISO":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "ND")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MN")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "IA")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "AR")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "LA")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "TX")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "WI")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "IL")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "IN")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MI")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "KY")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MS")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "ERCOT")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SPP")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "PJM")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "TNISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SOCO")]))
-			elif k1 == "TNISO":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "KY")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "TN")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "LA")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MS")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "AL")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NC")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "VA")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "PJM")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SOCO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "CARISO")]))
-			elif k1 == "SOCO":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MS")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "AL")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "GA")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "FL")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "TNISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "CARISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "FPISO")]))
-			elif k1 == "FPISO":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "FL")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SOCO")]))
-			elif k1 == "CARISO":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SC")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NC")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "SOCO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "TNISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "PJM")]))
-			elif k1 == "PJM":
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NC")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "VA")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "TN")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "KY")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "WV")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "OH")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "IN")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MI")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "IL")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MD")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "DE")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "PA")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NJ")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "CARISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "TNISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "MISO")]))
-				peerRecipient = ET.SubElement(controller, 'PeerRecipient', OrderedDict([('name', "NYISO")]))
+			controller = ET.SubElement(root, 'Controller', {'name': k1, 'status': 'true'})
+			if k1 in PEER_RECIPIENTS:
+				controller.extend([ET.Element('PeerRecipient', {'name': peer}) for peer in PEER_RECIPIENTS[k1]])
 			else:
 				print(k1)
 
 	def add_xml_services(self, root):
-		service = ET.SubElement(root, 'Service', OrderedDict([('name', 'deliverElectricity'), ('status', 'true')]))
+		service = ET.SubElement(root, 'Service', {'name': 'deliverElectricity', 'status': 'true'})
 		if self.elecGrid != None:
-			abstraction = ET.SubElement(service, 'ServicePlace', OrderedDict([('name', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(service, 'ServiceTransition', OrderedDict(
-				[('name', 'generate electric power'), ('preset', ''), ('postset', 'electric power at 132kV'),
-				 ('methodLinkName', 'generate electric power'), ('methodLinkRef', '')]))
-			abstraction = ET.SubElement(service, 'ServiceTransition', OrderedDict(
-				[('name', 'continuing electric power'), ('preset', 'electric power at 132kV'),
-				 ('postset', 'electric power at 132kV'), ('methodLinkName', 'transport'),
-				 ('methodLinkRef', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(service, 'ServiceTransition', OrderedDict(
-				[('name', 'consume electric power'), ('preset', 'electric power at 132kV'), ('postset', ''),
-				 ('methodLinkName', 'consume electric power'), ('methodLinkRef', '')]))
+			abstraction = ET.SubElement(service, 'ServicePlace', {'name': 'electric power at 132kV'})
+			abstraction = ET.SubElement(service, 'ServiceTransition', {
+				'name': 'generate electric power', 'preset': '', 'postset': 'electric power at 132kV',
+				'methodLinkName': 'generate electric power', 'methodLinkRef': ''})
+			abstraction = ET.SubElement(service, 'ServiceTransition', {
+				'name': 'continuing electric power', 'preset': 'electric power at 132kV',
+				'postset': 'electric power at 132kV', 'methodLinkName': 'transport',
+				'methodLinkRef': 'electric power at 132kV'})
+			abstraction = ET.SubElement(service, 'ServiceTransition', {
+				'name': 'consume electric power', 'preset': 'electric power at 132kV', 'postset': '',
+				'methodLinkName': 'consume electric power', 'methodLinkRef': ''})
 
 	def add_xml_abstraction_hfgt(self, root):
 
 		abstractions = ET.SubElement(root, 'Abstractions')
 
 		# output all MethodxForms and MethodxPorts
-		if 'electric power at 132kV' in self.refinements:
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'transport'), ('ref', 'electric power at 132kV'), ('operand', 'electric power at 132kV'),
-				 ('output', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'store'), ('ref', 'electric power at 132kV'), ('operand', 'electric power at 132kV'),
-				 ('output', 'electric power at 132kV')]))
-		if 'processed gas' in self.refinements:
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'transport'), ('ref', 'processed gas'), ('operand', 'processed gas'),
-				 ('output', 'processed gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'store'), ('ref', 'processed gas'), ('operand', 'processed gas'),
-				 ('output', 'processed gas')]))
-		if 'syngas' in self.refinements:
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'transport'), ('ref', 'syngas'), ('operand', 'syngas'), ('output', 'syngas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'store'), ('ref', 'syngas'), ('operand', 'syngas'), ('output', 'syngas')]))
-		if 'raw gas' in self.refinements:
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'transport'), ('ref', 'raw gas'), ('operand', 'raw gas'), ('output', 'raw gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'store'), ('ref', 'raw gas'), ('operand', 'raw gas'), ('output', 'raw gas')]))
-		if 'crude oil' in self.refinements:
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'transport'), ('ref', 'crude oil'), ('operand', 'crude oil'), ('output', 'crude oil')]))
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'store'), ('ref', 'crude oil'), ('operand', 'crude oil'), ('output', 'crude oil')]))
-		if 'processed oil' in self.refinements:
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'transport'), ('ref', 'processed oil'), ('operand', 'processed oil'),
-				 ('output', 'processed oil')]))
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'store'), ('ref', 'processed oil'), ('operand', 'processed oil'),
-				 ('output', 'processed oil')]))
-		if 'liquid biomass feedstock' in self.refinements:
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'transport'), ('ref', 'liquid biomass feedstock'), ('operand', 'liquid biomass feedstock'),
-				 ('output', 'liquid biomass feedstock')]))
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'store'), ('ref', 'liquid biomass feedstock'), ('operand', 'liquid biomass feedstock'),
-				 ('output', 'liquid biomass feedstock')]))
-		if 'solid biomass feedstock' in self.refinements:
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'transport'), ('ref', 'solid biomass feedstock'), ('operand', 'solid biomass feedstock'),
-				 ('output', 'solid biomass feedstock')]))
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'store'), ('ref', 'solid biomass feedstock'), ('operand', 'solid biomass feedstock'),
-				 ('output', 'solid biomass feedstock')]))
-		if 'coal' in self.refinements:
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'transport'), ('ref', 'coal'), ('operand', 'coal'), ('output', 'coal')]))
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'store'), ('ref', 'coal'), ('operand', 'coal'), ('output', 'coal')]))
-		if 'water energy' in self.refinements:
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'transport'), ('ref', 'water energy'), ('operand', 'water energy'), ('output', 'water energy')]))
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'store'), ('ref', 'water energy'), ('operand', 'water energy'), ('output', 'water energy')]))
-		if 'other' in self.refinements:
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'transport'), ('ref', 'other'), ('operand', 'other'), ('output', 'other')]))
-			abstraction = ET.SubElement(abstractions, 'MethodxPort', OrderedDict(
-				[('name', 'store'), ('ref', 'other'), ('operand', 'other'), ('output', 'other')]))
-
-
-		# add all MethodPairs
+		refSet = set(self.refinements)
+		for ref in TRANSPORTED_REFINEMENTS:
+			if ref in refSet:
+				for method in ('transport', 'store'):
+					abstraction = ET.SubElement(abstractions, 'MethodxPort', {'name': method, 'ref': ref, 'operand': ref, 'output': ref})
+
+		# add all MethodPairs of the systems present
+		pairAttribs = []
 		if self.elecGrid != None:
-			# abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-			# 	[('name1', 'generate electric power'), ('ref1', ''), ('name2', 'store'),
-			# 	 ('ref2', 'electric power at 132kV')]))
-			# abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-			# 	[('name1', 'generate electric power'), ('ref1', ''), ('name2', 'transport'),
-			# 	 ('ref2', 'electric power at 132kV')]))
-			# abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-			# 	[('name1', 'generate electric power'), ('ref1', ''), ('name2', 'consume electric power'),
-			# 	 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from processed gas'), ('ref1', ''), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from processed gas'), ('ref1', ''), ('name2', 'transport'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from processed gas'), ('ref1', ''),
-				 ('name2', 'consume electric power'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from processed oil'), ('ref1', ''), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from processed oil'), ('ref1', ''), ('name2', 'transport'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from processed oil'), ('ref1', ''),
-				 ('name2', 'consume electric power'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from syngas'), ('ref1', ''), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from syngas'), ('ref1', ''), ('name2', 'transport'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from syngas'), ('ref1', ''), ('name2', 'consume electric power'),
-				 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from coal'), ('ref1', ''), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from coal'), ('ref1', ''), ('name2', 'transport'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from coal'), ('ref1', ''), ('name2', 'consume electric power'),
-				 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from uranium'), ('ref1', ''), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from uranium'), ('ref1', ''), ('name2', 'transport'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from uranium'), ('ref1', ''), ('name2', 'consume electric power'),
-				 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from solid biomass feedstock'), ('ref1', ''), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from solid biomass feedstock'), ('ref1', ''),
-				 ('name2', 'transport'), ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from solid biomass feedstock'), ('ref1', ''),
-				 ('name2', 'consume electric power'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from liquid biomass feedstock'), ('ref1', ''), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from liquid biomass feedstock'), ('ref1', ''),
-				 ('name2', 'transport'), ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from liquid biomass feedstock'), ('ref1', ''),
-				 ('name2', 'consume electric power'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from other'), ('ref1', ''), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from other'), ('ref1', ''), ('name2', 'transport'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from other'), ('ref1', ''), ('name2', 'consume electric power'),
-				 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from water energy'), ('ref1', ''), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from water energy'), ('ref1', ''), ('name2', 'transport'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from water energy'), ('ref1', ''),
-				 ('name2', 'consume electric power'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from solar'), ('ref1', ''), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from solar'), ('ref1', ''), ('name2', 'transport'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from solar'), ('ref1', ''), ('name2', 'consume electric power'),
-				 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from wind energy'), ('ref1', ''), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from wind energy'), ('ref1', ''), ('name2', 'transport'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'generate electric power from wind energy'), ('ref1', ''),
-				 ('name2', 'consume electric power'), ('ref2', '')]))
-
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'electric power at 132kV'), ('name2', 'transport'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'electric power at 132kV'), ('name2', 'consume electric power'),
-				 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'electric power at 132kV'), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'electric power at 132kV'), ('name2', 'consume electric power'),
-				 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'electric power at 132kV'), ('name2', 'transport'),
-				 ('ref2', 'electric power at 132kV')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'electric power at 132kV'), ('name2', 'store'),
-				 ('ref2', 'electric power at 132kV')]))
-
+			pairAttribs.extend(ELEC_METHOD_PAIR_ATTRIBS)
 		if self.NGSystem != None:
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import raw gas'), ('ref1', ''), ('name2', 'transport'), ('ref2', 'raw gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import raw gas'), ('ref1', ''), ('name2', 'store'), ('ref2', 'raw gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'raw gas'), ('name2', 'transport'), ('ref2', 'raw gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'raw gas'), ('name2', 'store'), ('ref2', 'raw gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'raw gas'), ('name2', 'store'), ('ref2', 'raw gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'raw gas'), ('name2', 'transport'), ('ref2', 'raw gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'raw gas'), ('name2', 'compress raw gas'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'compress raw gas'), ('ref1', ''), ('name2', 'transport'), ('ref2', 'raw gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'raw gas'), ('name2', 'process raw gas'), ('ref2', '')]))
-
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'process raw gas'), ('ref1', ''), ('name2', 'transport'), ('ref2', 'processed gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import processed gas'), ('ref1', ''), ('name2', 'transport'), ('ref2', 'processed gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import processed gas'), ('ref1', ''), ('name2', 'store'), ('ref2', 'processed gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'processed gas'), ('name2', 'transport'), ('ref2', 'processed gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'processed gas'), ('name2', 'store'), ('ref2', 'processed gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'processed gas'), ('name2', 'store'), ('ref2', 'processed gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'processed gas'), ('name2', 'transport'), ('ref2', 'processed gas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'processed gas'), ('name2', 'compress processed gas'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'compress processed gas'), ('ref1', ''), ('name2', 'transport'), ('ref2', 'processed gas')]))
-			# abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-			# 	[('name1', 'transport'), ('ref1', 'processed gas'), ('name2', 'generate electric power'),
-			# 	 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'processed gas'),
-				 ('name2', 'generate electric power from processed gas'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'processed gas'), ('name2', 'export processed gas'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'processed gas'), ('name2', 'export processed gas'), ('ref2', '')]))
-
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import syngas'), ('ref1', ''), ('name2', 'transport'), ('ref2', 'syngas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import syngas'), ('ref1', ''), ('name2', 'store'), ('ref2', 'syngas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'syngas'), ('name2', 'transport'), ('ref2', 'syngas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'syngas'), ('name2', 'store'), ('ref2', 'syngas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'syngas'), ('name2', 'store'), ('ref2', 'syngas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'syngas'), ('name2', 'transport'), ('ref2', 'syngas')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'syngas'), ('name2', 'compress syngas'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'compress syngas'), ('ref1', ''), ('name2', 'transport'), ('ref2', 'syngas')]))
-			# abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-			# 	[('name1', 'transport'), ('ref1', 'syngas'), ('name2', 'generate electric power'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'syngas'), ('name2', 'generate electric power from syngas'),
-				 ('ref2', '')]))
-
+			pairAttribs.extend(NG_METHOD_PAIR_ATTRIBS)
 		if self.oilSystem != None:
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import crude oil'), ('ref1', ''), ('name2', 'transport'), ('ref2', 'crude oil')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'crude oil'), ('name2', 'transport'), ('ref2', 'crude oil')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'crude oil'), ('name2', 'store'), ('ref2', 'crude oil')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'crude oil'), ('name2', 'export crude oil'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'crude oil'), ('name2', 'process crude oil'), ('ref2', '')]))
-
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'process crude oil'), ('ref1', ''), ('name2', 'transport'), ('ref2', 'processed oil')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import processed oil'), ('ref1', ''), ('name2', 'transport'), ('ref2', 'processed oil')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import processed oil'), ('ref1', ''), ('name2', 'store'), ('ref2', 'processed oil')]))
-			# abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-			# 	[('name1', 'import processed oil'), ('ref1', ''), ('name2', 'export processed oil'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'processed oil'), ('name2', 'transport'), ('ref2', 'processed oil')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'processed oil'), ('name2', 'store'), ('ref2', 'processed oil')]))
-			# abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-			# 	[('name1', 'transport'), ('ref1', 'processed oil'), ('name2', 'generate electric power'),
-			# 	 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'processed oil'),
-				 ('name2', 'generate electric power from processed oil'), ('ref2', '')]))
-			# abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-			# 	[('name1', 'store'), ('ref1', 'processed oil'), ('name2', 'generate electric power'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'processed oil'), ('name2', 'generate electric power from processed oil'),
-				 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'processed oil'), ('name2', 'export processed oil'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'processed oil'), ('name2', 'export processed oil'), ('ref2', '')]))
-
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import liquid biomass feedstock'), ('ref1', ''), ('name2', 'transport'),
-				 ('ref2', 'liquid biomass feedstock')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'liquid biomass feedstock'), ('name2', 'transport'),
-				 ('ref2', 'processed oil')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'liquid biomass feedstock'), ('name2', 'store'),
-				 ('ref2', 'liquid biomass feedstock')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'liquid biomass feedstock'),
-				 ('name2', 'export liquid biomass feedstock'), ('ref2', '')]))
-			# abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-			# 	[('name1', 'transport'), ('ref1', 'liquid biomass feedstock'), ('name2', 'generate electric power'),
-			# 	 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'liquid biomass feedstock'),
-				 ('name2', 'generate electric power from liquid biomass feedstock'), ('ref2', '')]))
-			# abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-			# 	[('name1', 'store'), ('ref1', 'liquid biomass feedstock'), ('name2', 'generate electric power'),
-			# 	 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'liquid biomass feedstock'),
-				 ('name2', 'generate electric power from liquid biomass feedstock'), ('ref2', '')]))
-
+			pairAttribs.extend(OIL_METHOD_PAIR_ATTRIBS)
 		if self.coalSystem != None:
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import coal'), ('ref1', ''), ('name2', 'transport'), ('ref2', 'coal')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'import coal'), ('ref1', ''), ('name2', 'store'), ('ref2', 'coal')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'coal'), ('name2', 'transport'), ('ref2', 'coal')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'coal'), ('name2', 'store'), ('ref2', 'coal')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'coal'), ('name2', 'generate electric power'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'coal'), ('name2', 'generate electric power from coal'),
-				 ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'coal'), ('name2', 'transport'), ('ref2', 'coal')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'coal'), ('name2', 'store'), ('ref2', 'coal')]))
-			# abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-			# 	[('name1', 'store'), ('ref1', 'coal'), ('name2', 'generate electric power'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'coal'), ('name2', 'generate electric power from coal'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'transport'), ('ref1', 'coal'), ('name2', 'export coal'), ('ref2', '')]))
-			abstraction = ET.SubElement(abstractions, 'MethodPair', OrderedDict(
-				[('name1', 'store'), ('ref1', 'coal'), ('name2', 'export coal'), ('ref2', '')]))
+			pairAttribs.extend(COAL_METHOD_PAIR_ATTRIBS)
+
+		for attrib in pairAttribs:
+			abstraction = ET.SubElement(abstractions, 'MethodPair', attrib)
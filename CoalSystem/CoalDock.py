@@ -8,7 +8,6 @@ Copyright (c) 2018-2023 Laboratory for Intelligent Integrated Networks of Engine
 
 from ElectricGrid.ElectricNode import ElectricNode
 import xml.etree.ElementTree as ET
-from collections import OrderedDict
 
 class CoalDock(ElectricNode):
 	"""
@@ -47,23 +46,26 @@ class CoalDock(ElectricNode):
 		"""
 		This creates an XML branch for the dock object with functionality.
 		"""
-		machine = ET.SubElement(parent, 'Machine', OrderedDict([('name', self.nodeName), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('controller',', '.join(self.controller))]))
-		method_form = ET.SubElement(machine, 'MethodxForm', OrderedDict([('name', 'import coal'), ('operand',''),('output', 'coal'), ('status',self.status)]))
-		method_form = ET.SubElement(machine, 'MethodxForm', OrderedDict([('name', 'export coal'), ('operand','coal'),('output', ''), ('status',self.status)]))
-		method_port = ET.SubElement(machine, 'MethodxPort', OrderedDict([('name', 'store'), ('operand', 'coal'), ('output', 'coal'),('origin', self.nodeName), ('dest', self.nodeName), ('ref', 'coal'),('status', self.status)]))
+		machine = ET.SubElement(parent, 'Machine', {'name': self.nodeName, 'gpsX': str(self.gpsX), 'gpsY': str(self.gpsY), 'controller': ', '.join(self.controller)})
+		method_form = ET.SubElement(machine, 'MethodxForm', {'name': 'import coal', 'operand': '', 'output': 'coal', 'status': self.status})
+		method_form = ET.SubElement(machine, 'MethodxForm', {'name': 'export coal', 'operand': 'coal', 'output': '', 'status': self.status})
+		method_port = ET.SubElement(machine, 'MethodxPort', {'name': 'store', 'operand': 'coal', 'output': 'coal', 'origin': self.nodeName, 'dest': self.nodeName, 'ref': 'coal', 'status': self.status})
 
 	def add_xml_child_hfgt_dofs(self,parent, resourceCount, resourceIdx):
 		"""
 		This creates an XML branch for the dock object with functionality.
 		"""
-		resource = resourceCount[0]
-		method_form = ET.SubElement(parent, 'MethodxForm', OrderedDict(
-			[('resource', str(resource)), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'import coal'), ('operand', ''), ('output', 'coal'), ('status', self.status), ('controller',', '.join(self.controller))]))
-		method_form = ET.SubElement(parent, 'MethodxForm', OrderedDict(
-			[('resource', str(resource)), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'export coal'), ('operand', 'coal'), ('output', ''), ('status', self.status), ('controller',', '.join(self.controller))]))
-		method_port = ET.SubElement(parent, 'MethodxPort', OrderedDict(
-			[('resource', str(resource)), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', 'coal'), ('output', 'coal'), ('origin', str(resource)),
-			 ('dest', str(resource)), ('ref', 'coal'), ('status', self.status), ('controller',', '.join(self.controller))]))
+		resource = str(resourceCount[0])
+		gpsX = str(self.gpsX)
+		gpsY = str(self.gpsY)
+		controller = ', '.join(self.controller)
+		method_form = ET.SubElement(parent, 'MethodxForm', {
+			'resource': resource, 'gpsX': gpsX, 'gpsY': gpsY, 'name': 'import coal', 'operand': '', 'output': 'coal', 'status': self.status, 'controller': controller})
+		method_form = ET.SubElement(parent, 'MethodxForm', {
+			'resource': resource, 'gpsX': gpsX, 'gpsY': gpsY, 'name': 'export coal', 'operand': 'coal', 'output': '', 'status': self.status, 'controller': controller})
+		method_port = ET.SubElement(parent, 'MethodxPort', {
+			'resource': resource, 'gpsX': gpsX, 'gpsY': gpsY, 'name': 'store', 'operand': 'coal', 'output': 'coal', 'origin': resource,
+			'dest': resource, 'ref': 'coal', 'status': self.status, 'controller': controller})
+		resourceIdx[self.nodeName] = resourceCount[0]
 		resourceCount[0] += 1
-		resourceIdx[self.nodeName] = resource
 		return resourceCount, resourceIdx
\ No newline at end of file
@@ -5,18 +5,48 @@ Copyright (c) 2018-2023 Laboratory for Intelligent Integrated Networks of Engine
 @lab: Laboratory for Intelligent Integrated Networks of Engineering Systems
 @Modified: 09/29/2023
 """
+import sys
 import numpy as np
 import geopandas as gpd
 import scipy.sparse as sp
-from lxml import etree as ET
 from collections import OrderedDict
 
+from SnapEdges2Grid import firstPointCoords, boundaryCoords
 from ElectricGrid.GenC import GenC
 from CoalSystem.CoalDock import CoalDock
 from CoalSystem.CoalRailroad import CoalRailroad
 from CoalSystem.CoalSource import CoalSource
 from CoalSystem.CoalIndBuffer import CoalIndBuffer
 
+# canonical fuel refinement of each raw FUEL_CAT name found in the power plant shape files
+FUEL_ALIASES = (
+	('processed gas', ('BUTANE', 'METHANOL', 'COAL BED METHANE', 'METHANE', 'LANDFILL GAS', 'Natural Gas', 'REFINERY GAS',
+		'Processed Gas', 'GAS (GENERIC)', 'NATURAL GAS', 'HYDROGEN', 'BLAST FURNACE GAS',
+		'COKE OVEN GAS', 'LIQUIFIED PROPANE GAS', 'Depleted Field', 'Salt Cavern', 'Aquifer', 'LNG',
+		'Hydrogen', 'Hydrogen Gas', 'Nitrogen', 'Other Gas', 'Empty Gas', 'Natural Gas Liquids')),
+	('processed oil', ('DISTILLATE OIL', 'NO. 1 FUEL OIL', 'NO. 6 FUEL OIL', 'KEROSENE', 'Oil', 'NO. 2 FUEL OIL',
+		'PETROLEUM COKE', 'DIESEL FUEL', 'COKE', 'HFO', 'NO. 5 FUEL OIL', 'RESIDUAL OILS', 'NO. 4 FUEL OIL',
+		'BLACK LIQUOR', 'REFUSED DERIVED FUEL', 'JET FUEL', 'FUEL OIL', 'Non-HVL Product', 'Non_HVL Products',
+		'Gasoline', 'Empty Liquid', 'Fuel Oil NO. 6', 'Fuel Oil', 'processed oil', 'Liquefied Petroleum Gas',
+		'Fuel Oil, Kerosene, Gasoline, Jet, Diesel', 'Fuel Grade Ethanol', 'Highly Volatile Liquid',
+		'Refined Products', 'Empty Hazardous Liquid or Gas', 'Unleaded Gasoline')),
+	('crude oil', ('CRUDE OIL', 'Crude Oil')),
+	('syngas', ('LIGNITE COAL GAS (FROM COAL GASIFICATION)', 'WOOD GAS (FROM WOOD GASIFICATION)', 'ANTHRACITE',
+		'GAS FROM REFUSE GASIFICATION',
+		'GAS FROM BIOMASS GASIFICATION', 'COAL GAS (FROM COAL GASIFICATION)', 'GAS FROM FUEL OIL GASIFICATION',
+		'BITUMINOUS COAL GAS (FROM COAL GASIFICATION)')),
+	('coal', ('WASTE COAL', 'GOB', 'COAL (GENERIC)', 'LIGNITE', 'Coal', 'SUBBITUMINOUS', 'BITUMINOUS COAL')),
+	('uranium', ('URANIUM', 'Uranium')),
+	('solid biomass feedstock', ('AGRICULTURAL WASTE', 'REFUSE', 'MANURE', 'BIOMASS', 'TIRES', 'POULTRY LITTER')),
+	('liquid biomass feedstock', ('WASTE WATER SLUDGE', 'DIGESTER GAS (SEWAGE SLUDGE GAS)', 'BIODIESEL', 'WASTE GAS', 'GEOTHERMAL STEAM',
+		'WOOD WASTE LIQUIDS EXCL BLK LIQ (INCL RED LIQUOR,SLUDGE WOOD,SPENT SULFITE LIQUOR AND OTH LIQUIDS)')),
+	('water energy', ('Water', 'Water Energy')),
+	('solar', ('Solar',)),
+	('wind energy', ('Wind',)),
+	('other', ('Other', 'WASTE HEAT', 'STEAM', 'UNKNOWN', 'COMPRESSED AIR', 'NOT APPLICABLE')),
+)
+FUEL_MAP = {alias: sys.intern(fuel) for fuel, aliases in FUEL_ALIASES for alias in aliases}
+
 class CoalGrid:
 	"""
 	This class represents the physical coal system which contains coal power plants, docks, railroads, and sources.
@@ -29,6 +59,7 @@ class CoalGrid:
 		 CoalRailroad       coal railroads
 		 buffer_map       	coal buffer maps of gps coords
 		 refinements   		refinements in coal system
+		 refinementSet   	set of the refinements for membership tests
 	"""
 
 	def __init__(self):
@@ -44,6 +75,7 @@ class CoalGrid:
 		self.CoalRailroad = []
 		self.buffer_map = {}
 		self.refinements = ['coal']
+		self.refinementSet = set(self.refinements)
 
 	def __repr__(self):
 		"""
@@ -100,10 +132,17 @@ class CoalGrid:
 				df = df.reset_index()
 
 				# round coordinates to 4 decimal points for consistency
-				coords = [(round(pnt.geoms[0].x,4),round(pnt.geoms[0].y,4)) for pnt in df.geometry]
+				coords = firstPointCoords(df.geometry)
+
+				hasState = 'STUSPS' in df.columns
+				if not hasState:
+					print('No state attribute in  coal .SHP file')
+				hasISO = 'ISO' in df.columns
+				if not hasISO:
+					print('No ISO attribute in coal .SHP file')
 
-				for index,instance in df.iterrows():
-					if coords[index] in self.buffer_map:
+				for coord, instance in zip(coords, df.itertuples(index=False)):
+					if coord in self.buffer_map:
 						skipped_power_plants += 1
 						continue
 
@@ -111,27 +150,21 @@ class CoalGrid:
 					new_instance = GenC()
 					new_instance.nodeName = 'Coal Power Plant ' + str(plant_count)
 					new_instance.genName = 'Coal Power Plant ' + str(plant_count)
-					new_instance.gpsX = coords[index][0]
-					new_instance.gpsY = coords[index][1]
-					new_instance.cap = [max([instance['OP_CAP'], instance['SUMMER_CAP'], instance['WINTER_CAP']])]
-					new_instance.fuelType = instance['FUEL_CAT']
+					new_instance.gpsX = coord[0]
+					new_instance.gpsY = coord[1]
+					new_instance.cap = [max([instance.OP_CAP, instance.SUMMER_CAP, instance.WINTER_CAP])]
+					new_instance.fuelType = instance.FUEL_CAT
 					new_instance, fuels = self.set_fuel(new_instance, fuels)
 					new_instance.refinement = ['electric power at 132kV']+ new_instance.fuelType
-					for k1 in new_instance.refinement:
-						if k1 not in self.refinements:
-							self.refinements.append(k1)
+					self.add_refinements(new_instance.refinement)
 					new_instance.status = 'true'
 					new_instance.type = 'buffer'
-					try:
-						new_instance.state = instance['STUSPS']
-					except:
-						print('No state attribute in  coal .SHP file')
-					try:
-						new_instance.iso = instance['ISO']
-					except:
-						print('No ISO attribute in coal .SHP file')
+					if hasState:
+						new_instance.state = instance.STUSPS
+					if hasISO:
+						new_instance.iso = instance.ISO
 					self.genC.append(new_instance)
-					self.buffer_map[coords[index]] = new_instance.genName
+					self.buffer_map[coord] = new_instance.genName
 
 				skipped_power_plants = skipped_power_plants + init_plants-df.shape[0]
 
@@ -158,10 +191,14 @@ class CoalGrid:
 				init_plants = df.shape[0]
 
 				# round coordinates to 4 decimal points for consistency
-				coords = [(round(pnt.geoms[0].x,4),round(pnt.geoms[0].y,4)) for pnt in df.geometry]
+				coords = firstPointCoords(df.geometry)
 
-				for index, instance in df.iterrows():
-					if coords[index] in self.buffer_map:
+				hasState = 'STUSPS' in df.columns
+				if not hasState:
+					print('No state attribute in .SHP file')
+
+				for coord, instance in zip(coords, df.itertuples(index=False)):
+					if coord in self.buffer_map:
 						skipped_CoalDock += 1
 						continue
 
@@ -169,20 +206,16 @@ class CoalGrid:
 					new_instance = CoalDock()
 					new_instance.nodeName = 'Coal Dock ' + str(CoalDock_count)
 					new_instance.dockName = 'Coal Dock ' + str(CoalDock_count)
-					new_instance.gpsX = coords[index][0]
-					new_instance.gpsY = coords[index][1]
+					new_instance.gpsX = coord[0]
+					new_instance.gpsY = coord[1]
 					new_instance.type = 'buffer'
 					new_instance.refinement = ['coal']
-					for k1 in new_instance.refinement:
-						if k1 not in self.refinements:
-							self.refinements.append(k1)
+					self.add_refinements(new_instance.refinement)
 					new_instance.status = 'true'
-					try:
-						new_instance.state = instance['STUSPS']
-					except:
-						print('No state attribute in .SHP file')
+					if hasState:
+						new_instance.state = instance.STUSPS
 					self.CoalDock.append(new_instance)
-					self.buffer_map[coords[index]] = new_instance.dockName
+					self.buffer_map[coord] = new_instance.dockName
 
 		return self
 
@@ -209,10 +242,14 @@ class CoalGrid:
 				df = df.reset_index()
 
 				# round coordinates to 4 decimal points for consistency
-				coords = [(round(pnt.geoms[0].x,4),round(pnt.geoms[0].y,4)) for pnt in df.geometry]
+				coords = firstPointCoords(df.geometry)
+
+				hasState = 'STUSPS' in df.columns
+				if not hasState:
+					print('No state attribute in .SHP file')
 
-				for index,instance in df.iterrows():
-					if coords[index] in self.buffer_map:
+				for coord, instance in zip(coords, df.itertuples(index=False)):
+					if coord in self.buffer_map:
 						skipped_CoalSource += 1
 						continue
 
@@ -220,20 +257,16 @@ class CoalGrid:
 					new_instance = CoalSource()
 					new_instance.nodeName = 'Coal Source ' + str(CoalSource_count)
 					new_instance.sourceName = 'Coal Source ' + str(CoalSource_count)
-					new_instance.gpsX = coords[index][0]
-					new_instance.gpsY = coords[index][1]
+					new_instance.gpsX = coord[0]
+					new_instance.gpsY = coord[1]
 					new_instance.status = 'true'
 					new_instance.type = 'buffer'
 					new_instance.refinement = ['coal']
-					for k1 in new_instance.refinement:
-						if k1 not in self.refinements:
-							self.refinements.append(k1)
-					try:
-						new_instance.state = instance['STUSPS']
-					except:
-						print('No state attribute in .SHP file')
+					self.add_refinements(new_instance.refinement)
+					if hasState:
+						new_instance.state = instance.STUSPS
 					self.CoalSource.append(new_instance)
-					self.buffer_map[coords[index]] = new_instance.sourceName
+					self.buffer_map[coord] = new_instance.sourceName
 
 		return self
 
@@ -256,8 +289,7 @@ class CoalGrid:
 				skipped_CoalRailroad = 0
 				init_CoalRailroad = df.shape[0]
 
-				for index, instance in df.iterrows():
-					coords = [(round(pnt.x,4),round(pnt.y,4)) for pnt in instance.geometry.boundary]
+				for coords in boundaryCoords(df.geometry):
 					if len(coords)<2:
 						skipped_CoalRailroad += 1
 						continue
@@ -271,15 +303,24 @@ class CoalGrid:
 					new_instance.lineName = 'Coal Railroad ' + str(CoalRailroad_count)
 					new_instance.refinement = ['coal']
 					new_instance.fuelType = ['coal']
-					for k1 in new_instance.refinement:
-						if k1 not in self.refinements:
-							self.refinements.append(k1)
+					self.add_refinements(new_instance.refinement)
 					new_instance.status = 'true'
 					self.CoalRailroad.append(new_instance)
 
-		skipped_CoalRailroad = skipped_CoalRailroad + init_CoalRailroad - df.shape[0]
+				skipped_CoalRailroad = skipped_CoalRailroad + init_CoalRailroad - df.shape[0]
 		return self
 
+	def add_refinements(self, refinements):
+		"""
+		Appends the refinements that the coal system has not seen yet, keeping their first-seen order.
+		:param refinements: list of refinement names
+		:return: None
+		"""
+		for k1 in refinements:
+			if k1 not in self.refinementSet:
+				self.refinementSet.add(k1)
+				self.refinements.append(k1)
+
 	def set_fuel(self, node, fuels):
 		"""
 		This function takes as input node and set of fuels.
@@ -287,52 +328,15 @@ class CoalGrid:
 		:param fuels: set of fuels
 		:return: node with updated fuel source and updated fuel set with unhandled fuels.
 		"""
-		if node.fuelType in (
-		'BUTANE', 'METHANOL', 'COAL BED METHANE', 'METHANE', 'LANDFILL GAS', 'Natural Gas', 'REFINERY GAS',
-		'Processed Gas', 'GAS (GENERIC)', 'NATURAL GAS', 'HYDROGEN', 'BLAST FURNACE GAS',
-		'COKE OVEN GAS', 'LIQUIFIED PROPANE GAS', 'Depleted Field', 'Salt Cavern', 'Aquifer', 'LNG',
-							 'Hydrogen','Hydrogen Gas', 'Nitrogen','Other Gas', 'Empty Gas', 'Natural Gas Liquids'):
-			node.fuelType = 'processed gas'
-		elif node.fuelType in ('DISTILLATE OIL', 'NO. 1 FUEL OIL', 'NO. 6 FUEL OIL', 'KEROSENE', 'Oil', 'NO. 2 FUEL OIL',
-							   'PETROLEUM COKE','DIESEL FUEL', 'COKE', 'HFO', 'NO. 5 FUEL OIL', 'RESIDUAL OILS', 'NO. 4 FUEL OIL',
-							   'BLACK LIQUOR','REFUSED DERIVED FUEL','JET FUEL', 'FUEL OIL', 'Non-HVL Product','Non_HVL Products',
-							   'Gasoline', 'Empty Liquid', 'Fuel Oil NO. 6', 'Fuel Oil', 'processed oil', 'Liquefied Petroleum Gas',
-							   'Fuel Oil, Kerosene, Gasoline, Jet, Diesel', 'Fuel Grade Ethanol', 'Highly Volatile Liquid',
-							   'Refined Products', 'Empty Hazardous Liquid or Gas', 'Unleaded Gasoline'):
-			node.fuelType = 'processed oil'
-		elif node.fuelType in ('CRUDE OIL', 'Crude Oil'):
-			node.fuelType = 'crude oil'
-		elif node.fuelType in ('LIGNITE COAL GAS (FROM COAL GASIFICATION)', 'WOOD GAS (FROM WOOD GASIFICATION)', 'ANTHRACITE',
-							   'GAS FROM REFUSE GASIFICATION',
-							   'GAS FROM BIOMASS GASIFICATION', 'COAL GAS (FROM COAL GASIFICATION)', 'GAS FROM FUEL OIL GASIFICATION',
-							   'BITUMINOUS COAL GAS (FROM COAL GASIFICATION)'):
-			node.fuelType = 'syngas'
-		elif node.fuelType in (
-		'WASTE COAL', 'GOB', 'COAL (GENERIC)', 'LIGNITE', 'Coal', 'SUBBITUMINOUS', 'BITUMINOUS COAL'):
-			node.fuelType = 'coal'
-		elif node.fuelType in ('URANIUM', 'Uranium'):
-			node.fuelType = 'uranium'
-		elif node.fuelType in ('AGRICULTURAL WASTE', 'REFUSE', 'MANURE', 'BIOMASS', 'TIRES', 'POULTRY LITTER'):
-			node.fuelType = 'solid biomass feedstock'
-		elif node.fuelType in (
-		'WASTE WATER SLUDGE', 'DIGESTER GAS (SEWAGE SLUDGE GAS)', 'BIODIESEL', 'WASTE GAS', 'GEOTHERMAL STEAM',
-		'WOOD WASTE LIQUIDS EXCL BLK LIQ (INCL RED LIQUOR,SLUDGE WOOD,SPENT SULFITE LIQUOR AND OTH LIQUIDS)'):
-			node.fuelType = 'liquid biomass feedstock'
-		elif node.fuelType in ('Water', 'Water Energy'):
-			node.fuelType = 'water energy'
-		elif node.fuelType in ('Solar'):
-			node.fuelType = 'solar'
-		elif node.fuelType in ('Wind'):
-			node.fuelType = 'wind energy'
-		elif node.fuelType in ('Other', 'WASTE HEAT', 'STEAM', 'UNKNOWN', 'COMPRESSED AIR', 'NOT APPLICABLE'):
-			node.fuelType = 'other'
-		else:
+		fuelType = FUEL_MAP.get(node.fuelType)
+		if fuelType == None:
 			print('Found a new fuel type that needs to be handled')
 			print(node.fuelType)
 			fuels.add(node.fuelType)
+		else:
+			node.fuelType = fuelType
 
-		if node.fuelType not in self.refinements:
-			self.refinements.append(node.fuelType)
+		self.add_refinements([node.fuelType])
 
 		node.fuelType = [node.fuelType]
 
@@ -352,12 +356,23 @@ class CoalGrid:
 		ptsB = self.get_all_nodes()
 		ptsOD_GPSX, ptsOD_GPSY = self.get_all_endpointsRef()
 
-		ptsB_GPSX = sp.lil_matrix((len(ptsB), len(self.refinements)))
-		ptsB_GPSY = sp.lil_matrix((len(ptsB), len(self.refinements)))
+		# collect the (row, refinement, coordinate) triplets and build each matrix once
+		refIdx = {k1: i for i, k1 in enumerate(self.refinements)}
+		rows = []
+		cols = []
+		gpsX = []
+		gpsY = []
 		for i, k1 in enumerate(ptsB):
 			for k2 in k1.refinement:
-				ptsB_GPSX[i, self.refinements.index(k2)] = k1.gpsX
-				ptsB_GPSY[i, self.refinements.index(k2)] = k1.gpsY
+				rows.append(i)
+				cols.append(refIdx[k2])
+				gpsX.append(k1.gpsX)
+				gpsY.append(k1.gpsY)
+		shape = (len(ptsB), len(self.refinements))
+		rows = np.array(rows, dtype=int)
+		cols = np.array(cols, dtype=int)
+		ptsB_GPSX = sp.coo_matrix((np.array(gpsX, dtype=float), (rows, cols)), shape=shape)
+		ptsB_GPSY = sp.coo_matrix((np.array(gpsY, dtype=float), (rows, cols)), shape=shape)
 
 		return ptsB_GPSX, ptsB_GPSY, ptsOD_GPSX, ptsOD_GPSY
 
@@ -373,12 +388,13 @@ class CoalGrid:
 		:return: endpointsX: matrix of line origin and destination X coordinates of size lines*2 X refinements
 		:return: endpointsY: matrix of line origin and destination X coordinates of size lines*2 X refinements
 		"""
-		endpointsX = sp.lil_matrix((len(self.CoalRailroad) * 2, len(self.refinements)))
-		endpointsY = sp.lil_matrix((len(self.CoalRailroad) * 2, len(self.refinements)))
-		for i, k1 in enumerate(self.CoalRailroad):
-			endpointsX[i * 2, self.refinements.index(k1.refinement[0])] = k1.fBus[0]
-			endpointsY[i * 2, self.refinements.index(k1.refinement[0])] = k1.fBus[1]
-			endpointsX[i * 2 + 1, self.refinements.index(k1.refinement[0])] = k1.tBus[0]
-			endpointsY[i * 2 + 1, self.refinements.index(k1.refinement[0])] = k1.tBus[1]
+		# origin and destination of line i are rows 2i and 2i+1
+		refIdx = {k1: i for i, k1 in enumerate(self.refinements)}
+		shape = (len(self.CoalRailroad) * 2, len(self.refinements))
+		rows = np.arange(shape[0])
+		cols = np.repeat(np.array([refIdx[k1.refinement[0]] for k1 in self.CoalRailroad], dtype=int), 2)
+		ends = np.array([k2 for k1 in self.CoalRailroad for k2 in (k1.fBus, k1.tBus)], dtype=float).reshape(-1, 2)
+		endpointsX = sp.coo_matrix((ends[:, 0], (rows, cols)), shape=shape)
+		endpointsY = sp.coo_matrix((ends[:, 1], (rows, cols)), shape=shape)
 		return endpointsX, endpointsY
 
@@ -50,8 +50,8 @@ class CoalIndBuffer(ElectricNode):
 		resource = resourceCount[1]
 		for k1 in self.attrib_ref:
 			method_port = ET.SubElement(parent, 'MethodxPort', OrderedDict(
-				[('resource', "indBuff'"+str(resource)+"'"), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', k1), ('output', k1), ('origin', "indBuff'"+str(resource)+"'"),
-				 ('dest', "indBuff'"+str(resource)+"'"), ('ref', k1), ('status', 'true'), ('controller',', '.join(self.controller))]))
+				[('resource', str(resource)), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', k1), ('output', k1), ('origin', str(resource)),
+				 ('dest', str(resource)), ('ref', k1), ('status', 'true'), ('controller',', '.join(self.controller))]))
 		resourceCount[1] += 1
-		resourceIdx[self.nodeName] = "indBuff'"+str(resource)+"'"
+		resourceIdx[self.nodeName] = resource
 		return resourceCount, resourceIdx
\ No newline at end of file
@@ -9,7 +9,6 @@ Copyright (c) 2018-2023 Laboratory for Intelligent Integrated Networks of Engine
 import math as mt
 from ElectricGrid.ElectricNode import ElectricNode
 import xml.etree.ElementTree as ET
-from collections import OrderedDict
 
 
 class Bus(ElectricNode):
@@ -64,20 +63,23 @@ class Bus(ElectricNode):
 		This creates an XML branch for the ElectricLine object with functionality.
 		"""
 
-		indBuffer = ET.SubElement(parent, 'IndBuffer', OrderedDict([('name', self.nodeName), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)),('controller',', '.join(self.controller))]))
+		indBuffer = ET.SubElement(parent, 'IndBuffer', {'name': self.nodeName, 'gpsX': str(self.gpsX), 'gpsY': str(self.gpsY), 'controller': ', '.join(self.controller)})
 		for k1 in self.attrib_ref:
-			method_port = ET.SubElement(indBuffer, 'MethodxPort', OrderedDict([('name', 'store'), ('operand', k1), ('output', k1), ('origin', self.nodeName), ('dest', self.nodeName), ('ref', k1), ('status', 'true')]))
+			method_port = ET.SubElement(indBuffer, 'MethodxPort', {'name': 'store', 'operand': k1, 'output': k1, 'origin': self.nodeName, 'dest': self.nodeName, 'ref': k1, 'status': 'true'})
 
 	def add_xml_child_hfgt_dofs(self, parent, resourceCount, resourceIdx):
 		"""
 		This creates an XML branch for the ElectricLine object with functionality.
 		"""
-		resource = resourceCount[1]
+		resource = str(resourceCount[1])
+		gpsX = str(self.gpsX)
+		gpsY = str(self.gpsY)
+		controller = ', '.join(self.controller)
 		for k1 in self.attrib_ref:
-			method_port = ET.SubElement(parent, 'MethodxPort', OrderedDict(
-				[('resource', "indBuff'"+str(resource)+"'"), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', k1), ('output', k1), ('origin', "indBuff'"+str(resource)+"'"),
-				 ('dest', "indBuff'"+str(resource)+"'"), ('ref', k1), ('status', 'true'),('controller',', '.join(self.controller))]))
+			method_port = ET.SubElement(parent, 'MethodxPort', {
+				'resource': resource, 'gpsX': gpsX, 'gpsY': gpsY, 'name': 'store', 'operand': k1, 'output': k1, 'origin': resource,
+				'dest': resource, 'ref': k1, 'status': 'true', 'controller': controller})
 
+		resourceIdx[self.nodeName] = resourceCount[1]
 		resourceCount[1] += 1
-		resourceIdx[self.nodeName] = "indBuff'"+str(resource)+"'"
 		return resourceCount, resourceIdx
\ No newline at end of file
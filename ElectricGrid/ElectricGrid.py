@@ -19,6 +19,7 @@ from ElectricGrid.LoadC import LoadC
 from ElectricGrid.LoadS import LoadS
 from ElectricGrid.StorageC import StorageC
 from ElectricGrid.StorageS import StorageS
+from SnapEdges2Grid import firstPointCoords
 
 class ElectricGrid(object):
 	"""
@@ -128,83 +129,86 @@ class ElectricGrid(object):
 				df = df.reset_index()
 
 				# round coordinates to 4 decimal points for consistency
-				coords = [(round(pnt.geoms[0].x,4),round(pnt.geoms[0].y,4)) for pnt in df.geometry]
+				coords = firstPointCoords(df.geometry)
+
+				hasState = 'STUSPS' in df.columns
+				if not hasState:
+					print('No state attribute in .SHP file')
+				hasISO = 'ISO' in df.columns
+				if not hasISO:
+					print('No ISO attribute in .SHP file')
+
+				# largest of the three capacities of each plant, replaced only when strictly greater as max() does;
+				# object arrays keep each value's own int or float type, which the cap string is written from
+				caps = df['OP_CAP'].to_numpy(dtype=object)
+				for k1 in ('SUMMER_CAP', 'WINTER_CAP'):
+					cap = df[k1].to_numpy(dtype=object)
+					caps = np.where(cap > caps, cap, caps)
+				caps = caps.tolist()
 
 				# iterate over each powerplant
-				for index, instance in df.iterrows():
-					if coords[index] in self.buffer_map: # Skip if overlapping with existing node
+				for coord, cap, instance in zip(coords, caps, df.itertuples(index=False)):
+					if coord in self.buffer_map: # Skip if overlapping with existing node
 						skipped_power_plants += 1
 						continue
 
-					if instance['PRIME_MVR1'] == 'Pumped Storage':  # Handle Storage node
+					if instance.PRIME_MVR1 == 'Pumped Storage':  # Handle Storage node
 						storage_count += 1
 						new_instance = StorageC()
 						new_instance.nodeType = 'StoreC'
 						new_instance.nodeName = 'Pump Storage ' + str(storage_count)
 						new_instance.storageCName = 'Pump Storage ' + str(storage_count)
-						new_instance.gpsX = coords[index][0]
-						new_instance.gpsY = coords[index][1]
-						new_instance.cap = [max([instance['OP_CAP'], instance['SUMMER_CAP'], instance['WINTER_CAP']])]
-						new_instance.fuelType = instance['FUEL_CAT']
+						new_instance.gpsX = coord[0]
+						new_instance.gpsY = coord[1]
+						new_instance.cap = [cap]
+						new_instance.fuelType = instance.FUEL_CAT
 						[new_instance, fuels] = self.set_fuel(new_instance, fuels)
 						new_instance.refinement = ['electric power at 132kV'] + new_instance.fuelType
 						new_instance.status = True
-						try:
-							new_instance.state = instance['STUSPS']
-						except:
-							print('No state attribute in .SHP file')
-						try:
-							new_instance.iso = instance['ISO']
-						except:
-							print('No ISO attribute in .SHP file')
+						if hasState:
+							new_instance.state = instance.STUSPS
+						if hasISO:
+							new_instance.iso = instance.ISO
 						self.storageC.append(new_instance)
-						self.buffer_map[coords[index]] = new_instance.nodeName
-					elif (instance['PRIME_MVR1'] == 'Wind Turbine' or instance['PRIME_MVR1'] == 'Solar'):  # Handle stocastic renewable nodes
+						self.buffer_map[coord] = new_instance.nodeName
+					elif (instance.PRIME_MVR1 == 'Wind Turbine' or instance.PRIME_MVR1 == 'Solar'):  # Handle stocastic renewable nodes
 						plant_count += 1
 						new_instance = GenS()
 						new_instance.nodeType = 'GenS'
 						new_instance.nodeName = 'Power Plant ' + str(plant_count)
 						new_instance.genName = 'Power Plant ' + str(plant_count)
-						new_instance.gpsX = coords[index][0]
-						new_instance.gpsY = coords[index][1]
-						new_instance.cap = [max([instance['OP_CAP'], instance['SUMMER_CAP'], instance['WINTER_CAP']])]
-						new_instance.fuelType = instance['FUEL_CAT']
+						new_instance.gpsX = coord[0]
+						new_instance.gpsY = coord[1]
+						new_instance.cap = [cap]
+						new_instance.fuelType = instance.FUEL_CAT
 						new_instance, fuels = self.set_fuel(new_instance, fuels)
 						new_instance.refinement = ['electric power at 132kV'] + new_instance.fuelType
 						new_instance.status = True
-						try:
-							new_instance.state = instance['STUSPS']
-						except:
-							print('No state attribute in .SHP file')
-						try:
-							new_instance.iso = instance['ISO']
-						except:
-							print('No ISO attribute in .SHP file')
+						if hasState:
+							new_instance.state = instance.STUSPS
+						if hasISO:
+							new_instance.iso = instance.ISO
 						self.genS.append(new_instance)
-						self.buffer_map[coords[index]] = new_instance.nodeName
+						self.buffer_map[coord] = new_instance.nodeName
 					else:  # handle conventional power plant
 						plant_count += 1
 						new_instance = GenC()
 						new_instance.nodeType = 'GenC'
 						new_instance.nodeName = 'Power Plant ' + str(plant_count)
 						new_instance.genName = 'Power Plant ' + str(plant_count)
-						new_instance.gpsX = coords[index][0]
-						new_instance.gpsY = coords[index][1]
-						new_instance.cap = [max([instance['OP_CAP'], instance['SUMMER_CAP'], instance['WINTER_CAP']])]
-						new_instance.fuelType = instance['FUEL_CAT']
+						new_instance.gpsX = coord[0]
+						new_instance.gpsY = coord[1]
+						new_instance.cap = [cap]
+						new_instance.fuelType = instance.FUEL_CAT
 						new_instance, fuels = self.set_fuel(new_instance, fuels)
 						new_instance.refinement = ['electric power at 132kV'] + new_instance.fuelType
 						new_instance.status = True
-						try:
-							new_instance.state = instance['STUSPS']
-						except:
-							print('No state attribute in .SHP file')
-						try:
-							new_instance.iso = instance['ISO']
-						except:
-							print('No ISO attribute in .SHP file')
+						if hasState:
+							new_instance.state = instance.STUSPS
+						if hasISO:
+							new_instance.iso = instance.ISO
 						self.genC.append(new_instance)
-						self.buffer_map[coords[index]] = new_instance.nodeName
+						self.buffer_map[coord] = new_instance.nodeName
 
 					if new_instance.fuelType[0] not in self.refinements:
 						self.refinements.append(new_instance.fuelType[0])
@@ -225,83 +229,78 @@ class ElectricGrid(object):
 				df = df.reset_index()
 
 				# round coordinates to 4 decimal points for consistency
-				coords = [(round(pnt.geoms[0].x, 4), round(pnt.geoms[0].y, 4)) for pnt in df.geometry]
+				coords = firstPointCoords(df.geometry)
+
+				hasState = 'STUSPS' in df.columns
+				if not hasState:
+					print('No state attribute in .SHP file')
+				hasISO = 'ISO' in df.columns
+				if not hasISO:
+					print('No ISO attribute in .SHP file')
 
 				# iterate over each Gen Unit
-				for index, instance in df.iterrows():
-					if coords[index] in self.buffer_map:  # Skip if overlapping with existing node
+				for coord, instance in zip(coords, df.itertuples(index=False)):
+					if coord in self.buffer_map:  # Skip if overlapping with existing node
 						skipped_power_plants += 1
 						continue
 
-					if instance['PRIME_MVR'] == 'PUMPED STORAGE':  # Handle Storage node
+					if instance.PRIME_MVR == 'PUMPED STORAGE':  # Handle Storage node
 						storage_count += 1
 						new_instance = StorageC()
 						new_instance.nodeType = 'StoreC'
 						new_instance.nodeName = 'Pump Storage ' + str(storage_count)
 						new_instance.storageCName = 'Pump Storage ' + str(storage_count)
-						new_instance.gpsX = coords[index][0]
-						new_instance.gpsY = coords[index][1]
-						new_instance.cap = [instance['OP_CAP']]
-						new_instance.fuelType = instance['FUEL1']
+						new_instance.gpsX = coord[0]
+						new_instance.gpsY = coord[1]
+						new_instance.cap = [instance.OP_CAP]
+						new_instance.fuelType = instance.FUEL1
 						new_instance, fuels = self.set_fuel(new_instance, fuels)
 						new_instance.refinement = ['electric power at 132kV'] + new_instance.fuelType
 						new_instance.status = True
-						try:
-							new_instance.state = instance['STUSPS']
-						except:
-							print('No state attribute in .SHP file')
-						try:
-							new_instance.iso = instance['ISO']
-						except:
-							print('No ISO attribute in .SHP file')
+						if hasState:
+							new_instance.state = instance.STUSPS
+						if hasISO:
+							new_instance.iso = instance.ISO
 						self.storageC.append(new_instance)
-						self.buffer_map[coords[index]] = new_instance.nodeType
-					elif instance['PRIME_MVR'] == 'SOLAR' or instance['PRIME_MVR'] == 'WIND TURBINE':  # Handle stochastic generator: solar, wind
+						self.buffer_map[coord] = new_instance.nodeType
+					elif instance.PRIME_MVR == 'SOLAR' or instance.PRIME_MVR == 'WIND TURBINE':  # Handle stochastic generator: solar, wind
 						plant_count += 1
 						new_instance = GenS()
 						new_instance.nodeType = 'GenS'
 						new_instance.nodeName = 'Power Plant ' + str(plant_count)
 						new_instance.genName = 'Power Plant ' + str(plant_count)
-						new_instance.gpsX = coords[index][0]
-						new_instance.gpsY = coords[index][1]
-						new_instance.cap = [instance['OP_CAP']]
-						new_instance.fuelType = instance['FUEL1']
+						new_instance.gpsX = coord[0]
+						new_instance.gpsY = coord[1]
+						new_instance.cap = [instance.OP_CAP]
+						new_instance.fuelType = instance.FUEL1
 						new_instance, fuels = self.set_fuel(new_instance, fuels)
 						new_instance.refinement = ['electric power at 132kV'] + new_instance.fuelType
 						new_instance.status = True
-						try:
-							new_instance.state = instance['STUSPS']
-						except:
-							print('No state attribute in .SHP file')
-						try:
-							new_instance.iso = instance['ISO']
-						except:
-							print('No ISO attribute in .SHP file')
+						if hasState:
+							new_instance.state = instance.STUSPS
+						if hasISO:
+							new_instance.iso = instance.ISO
 						self.genS.append(new_instance)
-						self.buffer_map[coords[index]] = new_instance.nodeName
+						self.buffer_map[coord] = new_instance.nodeName
 					else:  # Handle controlled generator: all else, including water/hydro
 						plant_count += 1
 						new_instance = GenC()
 						new_instance.nodeType = 'GenC'
 						new_instance.nodeName = 'Power Plant ' + str(plant_count)
 						new_instance.genName = 'Power Plant ' + str(plant_count)
-						new_instance.gpsX = coords[index][0]
-						new_instance.gpsY = coords[index][1]
-						new_instance.cap = [instance['OP_CAP']]
-						new_instance.fuelType = instance['FUEL1']
+						new_instance.gpsX = coord[0]
+						new_instance.gpsY = coord[1]
+						new_instance.cap = [instance.OP_CAP]
+						new_instance.fuelType = instance.FUEL1
 						new_instance, fuels = self.set_fuel(new_instance, fuels)
 						new_instance.refinement = ['electric power at 132kV'] + new_instance.fuelType
 						new_instance.status = True
-						try:
-							new_instance.state = instance['STUSPS']
-						except:
-							print('No state attribute in .SHP file')
-						try:
-							new_instance.iso = instance['ISO']
-						except:
-							print('No ISO attribute in .SHP file')
+						if hasState:
+							new_instance.state = instance.STUSPS
+						if hasISO:
+							new_instance.iso = instance.ISO
 						self.genC.append(new_instance)
-						self.buffer_map[coords[index]] = new_instance.nodeName
+						self.buffer_map[coord] = new_instance.nodeName
 
 					if new_instance.fuelType[0] not in self.refinements:
 						self.refinements.append(new_instance.fuelType[0])
@@ -350,11 +349,18 @@ class ElectricGrid(object):
 				df = df.reset_index()
 
 				# round coordinates to 4 decimal points for consistency
-				coords = [(round(pnt.geoms[0].x, 4), round(pnt.geoms[0].y, 4)) for pnt in df.geometry]
+				coords = firstPointCoords(df.geometry)
+
+				hasState = 'STUSPS' in df.columns
+				if not hasState:
+					print('No state attribute in .SHP file')
+				hasISO = 'ISO' in df.columns
+				if not hasISO:
+					print('No ISO attribute in .SHP file')
 
 				# iterate over each load
-				for index, instance in df.iterrows():
-					if coords[index] in self.buffer_map:  # Skip if overlapping with existing node
+				for coord, instance in zip(coords, df.itertuples(index=False)):
+					if coord in self.buffer_map:  # Skip if overlapping with existing node
 						skipped_substations += 1
 						continue
 					substation_count += 1
@@ -362,21 +368,17 @@ class ElectricGrid(object):
 					new_instance.nodeType = 'LoadC'
 					new_instance.nodeName = 'Substation ' + str(substation_count)
 					new_instance.loadName = 'Substation ' + str(substation_count)
-					new_instance.gpsX = coords[index][0]
-					new_instance.gpsY = coords[index][1]
+					new_instance.gpsX = coord[0]
+					new_instance.gpsY = coord[1]
 					new_instance.loadCType = 'electric power at 132kV'
 					new_instance.refinement = ['electric power at 132kV']
 					new_instance.status = True
-					try:
-						new_instance.state = instance['STUSPS']
-					except:
-						print('No state attribute in .SHP file')
-					try:
-						new_instance.iso = instance['ISO']
-					except:
-						print('No ISO attribute in .SHP file')
+					if hasState:
+						new_instance.state = instance.STUSPS
+					if hasISO:
+						new_instance.iso = instance.ISO
 					self.loadC.append(new_instance)
-					self.buffer_map[coords[index]] = new_instance.nodeName
+					self.buffer_map[coord] = new_instance.nodeName
 
 				skipped_substations = skipped_substations + init_stations-df.shape[0]
 
@@ -408,6 +410,8 @@ class ElectricGrid(object):
 		"""
 		print("Instantiating Transmission")
 
+		# end points of the lines kept so far, unordered so that reversed duplicates match too
+		existingLines = {frozenset((line.fBus, line.tBus)) for line in self.electricLine}
 		for file in data:
 			if 'Transmission' in file:
 				df = gpd.read_file(file)
@@ -430,15 +434,11 @@ class ElectricGrid(object):
 					new_instance.tBus = lineDest
 					new_instance.fBus_gps = lineOrigin
 					new_instance.tBus_gps = lineDest
-					dup = 0
-					for line in self.electricLine:  # check to see if the line already exists
-						if (new_instance.fBus == line.fBus and new_instance.tBus == line.tBus) \
-								or (new_instance.fBus == line.tBus and new_instance.tBus == line.fBus):
-							dup = 1
-							break
-					if dup == 1:
+					lineEnds = frozenset((lineOrigin, lineDest))
+					if lineEnds in existingLines:  # check to see if the line already exists in either direction
 						skipped_Lines += 1
 						continue
+					existingLines.add(lineEnds)
 
 					transmission_count += 1
 					new_instance.lineName = 'Transmission Line ' + str(transmission_count)
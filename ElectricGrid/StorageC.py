@@ -77,7 +77,7 @@ class StorageC(ElectricNode):
         This creates an XML branch for the StorageC object with functionality.
         """
         resource = resourceCount[1]
-        method_port = ET.SubElement(parent, 'MethodxPort', OrderedDict([('resource', "indBuff'"+str(resource)+"'"), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', 'electric power at 132kV'), ('output', 'electric power at 132kV'), ('origin', "indBuff'"+str(resource)+"'"), ('dest', "indBuff'"+str(resource)+"'"), ('ref', 'electric power at 132kV'),('status','true'), ('controller',', '.join(self.controller))]))
+        method_port = ET.SubElement(parent, 'MethodxPort', OrderedDict([('resource', str(resource)), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', 'electric power at 132kV'), ('output', 'electric power at 132kV'), ('origin', str(resource)), ('dest', str(resource)), ('ref', 'electric power at 132kV'),('status','true'), ('controller',', '.join(self.controller))]))
         resourceCount[1] += 1
-        resourceIdx[self.storageCName] = "indBuff'"+str(resource)+"'"
+        resourceIdx[self.storageCName] = resource
         return resourceCount, resourceIdx
\ No newline at end of file
@@ -56,10 +56,10 @@ class NGStorage(ElectricNode):
 		This creates an XML branch for the storage object with functionality.
 		"""
 		resource = resourceCount[1]
-		method_port = ET.SubElement(parent, 'MethodxPort', OrderedDict([('resource', "indBuff'"+str(resource)+"'"), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', 'processed gas'), ('output', 'processed gas'),('origin', "indBuff'"+str(resource)+"'"), ('dest', "indBuff'"+str(resource)+"'"), ('ref', 'processed gas'),('status', self.status),('controller',', '.join(self.controller))]))
-		method_port = ET.SubElement(parent, 'MethodxPort', OrderedDict([('resource', "indBuff'"+str(resource)+"'"), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', 'syngas'), ('output', 'syngas'),('origin', "indBuff'"+str(resource)+"'"), ('dest', "indBuff'"+str(resource)+"'"), ('ref', 'syngas'),('status', self.status),('controller',', '.join(self.controller))]))
-		method_port = ET.SubElement(parent, 'MethodxPort', OrderedDict([('resource', "indBuff'"+str(resource)+"'"), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', 'raw gas'), ('output', 'raw gas'),('origin', "indBuff'"+str(resource)+"'"), ('dest', "indBuff'"+str(resource)+"'"), ('ref', 'raw gas'),('status', self.status),('controller',', '.join(self.controller))]))
+		method_port = ET.SubElement(parent, 'MethodxPort', OrderedDict([('resource', str(resource)), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', 'processed gas'), ('output', 'processed gas'),('origin', str(resource)), ('dest', str(resource)), ('ref', 'processed gas'),('status', self.status),('controller',', '.join(self.controller))]))
+		method_port = ET.SubElement(parent, 'MethodxPort', OrderedDict([('resource', str(resource)), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', 'syngas'), ('output', 'syngas'),('origin', str(resource)), ('dest', str(resource)), ('ref', 'syngas'),('status', self.status),('controller',', '.join(self.controller))]))
+		method_port = ET.SubElement(parent, 'MethodxPort', OrderedDict([('resource', str(resource)), ('gpsX', str(self.gpsX)), ('gpsY', str(self.gpsY)), ('name', 'store'), ('operand', 'raw gas'), ('output', 'raw gas'),('origin', str(resource)), ('dest', str(resource)), ('ref', 'raw gas'),('status', self.status),('controller',', '.join(self.controller))]))
 
 		resourceCount[1] += 1
-		resourceIdx[self.storeName] = "indBuff'"+str(resource)+"'"
+		resourceIdx[self.storeName] = resource
 		return resourceCount, resourceIdx
\ No newline at end of file
@@ -8,6 +8,7 @@ Copyright (c) 2018-2023 Laboratory for Intelligent Integrated Networks of Engine
 import numpy as np
 import scipy as sp
 from scipy.spatial import distance_matrix
+from scipy.spatial import cKDTree
 import scipy.sparse as sp
 
 def snapEdges2GridRef(ptsBX, ptsBY, ptsODX, ptsODY):
@@ -37,13 +38,22 @@ def snapEdges2GridRef(ptsBX, ptsBY, ptsODX, ptsODY):
     clusters = np.array([None] * ptsX.nnz)
     clust = 0
 
+    # index the points of each refinement once, the trees only return candidates and the
+    # distances are still checked exactly below
+    refPts, refTree = getRefTrees(ptsX, ptsY)
+    refODPts, refODTree = getRefTrees(ptsODX, ptsODY)
+    noPts = np.array([], dtype=int)
+
+    rowOrder, rowStart = getRowIdx(ptsODX)
+
     print('creating primary cluster')
     for k1 in range(ptsODX.shape[0]):
-        lineIdx = np.where(ptsODX.row == k1)[0]
+        lineIdx = rowOrder[rowStart[k1]:rowStart[k1 + 1]]
         if any(clusters[lineIdx] != None):
             continue
         for k2 in lineIdx:
-            refIdx = np.where(ptsX.col == ptsODX.col[k2])[0]
+            near = refTree[ptsODX.col[k2]].query_ball_point((ptsODX.data[k2], ptsODY.data[k2]), eps1 * (1 + 1e-9))
+            refIdx = refPts[ptsODX.col[k2]][np.sort(np.array(near, dtype=int))]
             distances = ((ptsODX.data[k2]-ptsX.data[refIdx])**2 + (ptsODY.data[k2]-ptsY.data[refIdx])**2)**0.5
             found = np.where(distances <= eps1)[0]
             foundIDX = refIdx[found]
@@ -62,9 +72,12 @@ def snapEdges2GridRef(ptsBX, ptsBY, ptsODX, ptsODY):
     isoNodes = np.where(np.equal(clusters, None))[0]
     resourcesToAdd = []
     for k2 in isoNodes:
-        refIdx = np.where(ptsODX.col == ptsX.col[k2])[0]
+        refIdx = refODPts.get(ptsX.col[k2], noPts)
         if not refIdx.any():
             continue
+        nearDist = refODTree[ptsX.col[k2]].query((ptsX.data[k2], ptsY.data[k2]))[0]
+        near = refODTree[ptsX.col[k2]].query_ball_point((ptsX.data[k2], ptsY.data[k2]), nearDist * (1 + 1e-9) + 1e-12)
+        refIdx = refIdx[np.sort(np.array(near, dtype=int))]
         distances = ((ptsX.data[k2] - ptsODX.data[refIdx]) ** 2 + (ptsY.data[k2] - ptsODY.data[refIdx]) ** 2) ** 0.5
         nearest = np.argmin(distances)
         nearestIDX = refIdx[nearest]
@@ -80,6 +93,36 @@ def snapEdges2GridRef(ptsBX, ptsBY, ptsODX, ptsODY):
 
     return clusters, clustCenters, pts, ptsX, ptsY, resourcesToAdd
 
+def getRowIdx(pts_GPS):
+    """
+    index the points of each row, the points of row k1 are rowOrder[rowStart[k1]:rowStart[k1 + 1]]
+
+    :param: pts_GPS: matrix of coordinates of size points X refinements
+    :return: rowOrder: the point indices sorted by row
+    :return: rowStart: the position in rowOrder of the first point of each row
+    """
+    rowOrder = np.argsort(pts_GPS.row, kind='stable')
+    rowStart = np.searchsorted(pts_GPS.row[rowOrder], np.arange(pts_GPS.shape[0] + 1))
+
+    return rowOrder, rowStart
+
+def getRefTrees(pts_GPSX, pts_GPSY):
+    """
+    build a KD-tree over the points of each refinement
+
+    :param: pts_GPSX: matrix of X coordinates of size points X refinements
+    :param: pts_GPSY: matrix of Y coordinates of size points X refinements
+    :return: refPts: A dictionary of each refinement to the indices of its points
+    :return: refTree: A dictionary of each refinement to the KD-tree of its points
+    """
+    refPts = {}
+    refTree = {}
+    for k1 in np.unique(pts_GPSX.col):
+        refPts[k1] = np.where(pts_GPSX.col == k1)[0]
+        refTree[k1] = cKDTree(np.column_stack((pts_GPSX.data[refPts[k1]], pts_GPSY.data[refPts[k1]])))
+
+    return refPts, refTree
+
 def getClustMidpointsRef(pts_GPSX, pts_GPSY, clusters):
     """
     calculate the midpoints of each cluster of points
@@ -106,3 +149,45 @@ def getClustMidpointsRef(pts_GPSX, pts_GPSY, clusters):
         pts_GPSY.data[clustIDX] = clustCenter[k1][1]
 
     return clustCenter, midpoint, pts_GPSX, pts_GPSY
+
+def getClusterIdx(clusters, minPts=1):
+    """
+    group the point indices of each cluster
+
+    :param: clusters: A list of size # of points, designating each points cluster
+    :param: minPts: clusters with fewer points than this are left out
+    :return: clusterIdx: A dictionary of each cluster (in ascending order) to the indices of its points
+    """
+    order = np.argsort(clusters, kind='stable')
+    uniClusts, starts, counts = np.unique(clusters[order], return_index=True, return_counts=True)
+    groups = np.split(order, starts[1:])
+
+    return {clust: pts for clust, pts, count in zip(uniClusts, groups, counts) if count >= minPts}
+
+def firstPointCoords(geometry):
+    """
+    read the first point of every (multi)point geometry in one pass and round it to 4 decimal points
+
+    :param: geometry: GeoSeries of point or multipoint geometries
+    :return: coords: A list of (x, y) tuples, one for each geometry in the order of the GeoSeries
+    """
+    geometry = geometry.reset_index(drop=True)
+    pts = geometry.get_coordinates().groupby(level=0).first().reindex(geometry.index)
+    if pts['x'].isna().any():  # a missing or empty geometry would shift every later row
+        raise ValueError('geometry without a point at row ' + str(pts.index[pts['x'].isna()][0]))
+
+    return [(round(x, 4), round(y, 4)) for x, y in zip(pts['x'].tolist(), pts['y'].tolist())]
+
+def boundaryCoords(geometry):
+    """
+    read the boundary points of every line geometry in one pass and round them to 4 decimal points
+
+    :param: geometry: GeoSeries of line or multiline geometries
+    :return: coords: A list with the list of (x, y) boundary tuples of each geometry, in the order of the GeoSeries
+    """
+    pts = geometry.boundary.get_coordinates()
+    coords = [[] for k1 in range(len(geometry))]
+    for k1, x, y in zip(geometry.index.get_indexer(pts.index).tolist(), pts['x'].tolist(), pts['y'].tolist()):
+        coords[k1].append((round(x, 4), round(y, 4)))
+
+    return coords